@@ -5,12 +5,27 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, ImageFilter, ImageEnhance
 import os
-from pathlib import Path
+import io
+import math
+import itertools
+import argparse
+import json
+import mmap
+import struct
+import threading
+import time
+import queue
+import zipfile
+import tarfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
 import random
 from pillow_heif import register_heif_opener
 import yaml
+import numpy as np
 
 # Register HEIF opener with PIL
 register_heif_opener()
@@ -34,10 +49,82 @@ def load_config():
     
     return config
 
+# Rotation intervals used when config.yaml has no augmentations section
+DEFAULT_AUGMENTATIONS = {
+    'suffix': 'rot',
+    'ops': [{'op': 'rotate', 'intervals': [[-35, -20], [-20, -5], [5, 20], [20, 35]]}],
+}
+
+AUGMENTATION_OPS = ('rotate', 'flip', 'scale', 'color_jitter', 'blur')
+
+def load_augmentation_pipeline(config):
+    """Validate the augmentations section of the config and resolve each op's fan-out"""
+    config = config or DEFAULT_AUGMENTATIONS
+    ops = []
+    for op in config.get('ops') or []:
+        op = dict(op)
+        if op.get('op') not in AUGMENTATION_OPS:
+            raise ValueError(f"Unknown augmentation op in config.yaml: {op.get('op')}")
+        
+        # A rotation with intervals makes one output per interval
+        if op['op'] == 'rotate' and 'intervals' in op:
+            op['fan_out'] = len(op['intervals'])
+        elif op['op'] == 'rotate' and 'range' not in op:
+            raise ValueError("Rotate augmentation needs 'intervals' or 'range' in config.yaml")
+        op['fan_out'] = int(op.get('fan_out', 1))
+        if op['fan_out'] < 1:
+            raise ValueError(f"Augmentation fan_out must be at least 1 ({op['op']})")
+        ops.append(op)
+    
+    if not ops:
+        raise ValueError("No augmentation ops specified in config.yaml")
+    
+    return {
+        'suffix': config.get('suffix', 'aug'),
+        'workers': config.get('workers', 0) or None,
+        'ops': ops,
+    }
+
 # Load configuration
 CONFIG = load_config()
 AUTHOR = CONFIG['author']
 CATEGORIES = [(cat['display_name'], cat['file_prefix']) for cat in CONFIG['categories']]
+PIXEL_STORE = CONFIG.get('pixel_store') or {}
+CROP_PROPOSALS = CONFIG.get('crop_proposals') or {}
+CATEGORY_INDEX = CONFIG.get('category_index') or {}
+CONTACT_SHEET = CONFIG.get('contact_sheet') or {}
+MULTI_CROP = CONFIG.get('multi_crop') or {}
+OUTPUT = CONFIG.get('output') or {}
+SCHEDULER = CONFIG.get('scheduler') or {}
+PROGRESS = CONFIG.get('progress') or {}
+INGEST = CONFIG.get('ingest') or {}
+ANNOTATIONS = CONFIG.get('annotations') or {}
+IMAGE_CACHE = CONFIG.get('image_cache') or {}
+CROP_PREVIEW = CONFIG.get('crop_preview') or {}
+AUGMENTATIONS = load_augmentation_pipeline(CONFIG.get('augmentations'))
+
+# Supported image extensions for the input folders
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+# Output encoding settings (see the output section of config.yaml)
+RESAMPLE_FILTERS = {
+    'nearest': Image.Resampling.NEAREST,
+    'box': Image.Resampling.BOX,
+    'bilinear': Image.Resampling.BILINEAR,
+    'hamming': Image.Resampling.HAMMING,
+    'bicubic': Image.Resampling.BICUBIC,
+    'lanczos': Image.Resampling.LANCZOS,
+}
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'PNG': '.png'}
+
+# Archives read directly from the input folder
+ARCHIVE_PATTERNS = ('*.zip', '*.tar', '*.tar.gz', '*.tgz', '*.tar.bz2', '*.tar.xz')
+ARCHIVES = CONFIG.get('archives') or {}
+
+# Raw pixel store format: fixed header followed by uncompressed pixel rows
+RAW_EXTENSION = '.pic'
+RAW_MAGIC = b'PICRAW01'
+RAW_HEADER = struct.Struct('<8s4sII')  # magic, mode, width, height
 
 def convert_heic_to_jpg(folder_path):
     """Convert all HEIC images in the folder to JPG format"""
@@ -67,6 +154,1319 @@ def convert_heic_to_jpg(folder_path):
     if converted_count > 0:
         print(f"Converted {converted_count} HEIC images to JPG")
 
+def write_raw_image(img, path):
+    """Write an image to the raw pixel store (uncompressed, memory-mappable)"""
+    # Only keep modes Pillow can map without copying
+    if img.mode not in ('L', 'RGBA', 'RGBX'):
+        img = img.convert('RGBA' if 'A' in img.getbands() else 'RGBX')
+    
+    header = RAW_HEADER.pack(RAW_MAGIC, img.mode.encode('ascii').ljust(4, b'\0'), img.width, img.height)
+    
+    # Write to a temporary file first so readers never see a partial image
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(img.tobytes())
+    os.replace(tmp_path, path)
+
+def read_raw_image(path):
+    """Open an image from the raw pixel store without decoding or copying it"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, mode, width, height = RAW_HEADER.unpack_from(buffer)
+    if magic != RAW_MAGIC:
+        buffer.close()
+        raise ValueError(f"{path.name} is not a raw pixel store file")
+    mode = mode.rstrip(b'\0').decode('ascii')
+    
+    # The image keeps a reference to the mapping, which stays open as long as the image lives
+    pixels = memoryview(buffer)[RAW_HEADER.size:]
+    return Image.frombuffer(mode, (width, height), pixels, 'raw', mode, 0, 1)
+
+def open_image(path):
+    """Open an image, from the raw pixel store, an archive, an annotated crop or an encoded file"""
+    if isinstance(path, ArchiveMember):
+        return Image.open(io.BytesIO(path.read_bytes()))
+    if isinstance(path, AnnotatedCrop):
+        return path.decode()
+    if path.suffix == RAW_EXTENSION:
+        return read_raw_image(path)
+    return Image.open(path)
+
+def output_settings(stage):
+    """Get the output settings of a stage (cropped, multi_cropped or rotated)"""
+    settings = dict(OUTPUT.get(stage) or {})
+    if settings.get('format'):
+        settings['format'] = settings['format'].upper()
+        if settings['format'] not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format for {stage}: {settings['format']}")
+    if settings.get('resample', 'lanczos') not in RESAMPLE_FILTERS:
+        raise ValueError(f"Unknown resample filter for {stage}: {settings['resample']}")
+    return settings
+
+def normalize_output(img, settings):
+    """Downscale an image so its longest side fits the stage's target size (never upscales)"""
+    size = (settings or {}).get('size')
+    if not size or max(img.size) <= size:
+        return img
+    
+    scale = size / max(img.size)
+    new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    resample = RESAMPLE_FILTERS[settings.get('resample', 'lanczos')]
+    return img.resize(new_size, resample, reducing_gap=3.0)
+
+def load_for_output(path, settings):
+    """Decode an image already downscaled to the stage's target size, with a reduced decode when possible"""
+    with open_image(path) as img:
+        size = (settings or {}).get('size')
+        if size:
+            img.draft('RGB', (size, size))
+        source = img.convert('RGB') if img.mode not in ('RGB', 'L') else img.copy()
+    return normalize_output(source, settings)
+
+def decode_region(path, box, settings):
+    """Decode a box of an image (original coordinates) and downscale it to the stage's target size
+    
+    JPEG images are decoded at a reduced scale when the target size allows it.
+    """
+    with open_image(path) as img:
+        full_width, full_height = img.size
+        size = (settings or {}).get('size')
+        side = max(box[2] - box[0], box[3] - box[1])
+        if size and side > size:
+            # Draft keeps at least the requested size, so the box stays >= size pixels
+            scale = size / side
+            img.draft('RGB', (math.ceil(full_width * scale), math.ceil(full_height * scale)))
+        
+        scale_x = img.width / full_width
+        scale_y = img.height / full_height
+        region = img.crop((box[0] * scale_x, box[1] * scale_y, box[2] * scale_x, box[3] * scale_y))
+    return normalize_output(region, settings)
+
+def encode_image(img, path, settings=None):
+    """Save an image as a compressed file with the stage's format, quality and chroma subsampling"""
+    settings = settings or {}
+    image_format = settings.get('format') or Image.registered_extensions().get(path.suffix.lower())
+    
+    # Drop the raw store padding band, and alpha for formats without it
+    if img.mode == 'RGBX' or (image_format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK')):
+        img = img.convert('RGB')
+    
+    params = {}
+    if image_format in ('JPEG', 'WEBP') and settings.get('quality'):
+        params['quality'] = settings['quality']
+    if image_format == 'JPEG' and settings.get('subsampling'):
+        params['subsampling'] = settings['subsampling']
+    img.save(path, format=image_format, **params)
+
+def encoded_suffix(path):
+    """Get the extension to use when encoding an image derived from this file"""
+    return '.jpg' if path.suffix == RAW_EXTENSION else path.suffix
+
+def output_extension(path, settings):
+    """Get the extension of an image derived from this file, following the stage's format"""
+    if settings and settings.get('format'):
+        return FORMAT_EXTENSIONS[settings['format']]
+    return encoded_suffix(path)
+
+def save_intermediate(img, folder, stem, extension, settings=None):
+    """Save an intermediate stage image to the raw store and/or as an encoded file
+    
+    Returns the path the next stage should read (the raw file when there is one).
+    """
+    img = normalize_output(img, settings)
+    raw_path = None
+    if PIXEL_STORE.get('enabled', False):
+        raw_path = folder / f"{stem}{RAW_EXTENSION}"
+        write_raw_image(img, raw_path)
+        if not PIXEL_STORE.get('keep_encoded_copy', True):
+            return raw_path
+    encoded_path = folder / f"{stem}{extension}"
+    encode_image(img, encoded_path, settings)
+    return raw_path or encoded_path
+
+def atomic_write_json(path, data):
+    """Write a JSON file through a temporary file so a crash never leaves it half-written"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def file_signature(path):
+    """Get a cheap signature telling whether a file changed since it was last analyzed"""
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def load_proxy(path, max_size):
+    """Decode a small RGB proxy of an image, using JPEG reduced decoding when possible"""
+    with open_image(path) as img:
+        original_size = img.size
+        img.draft('RGB', (max_size, max_size))
+        proxy = img.convert('RGB')
+    proxy.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+    return proxy, original_size
+
+def load_preview(path, max_size):
+    """Decode an image for display, fitting in max_size, using JPEG reduced decoding when possible"""
+    with open_image(path) as img:
+        img.draft('RGB', max_size)
+        preview = img.convert('RGB')
+    preview.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return preview
+
+def decoded_size(value):
+    """Estimate the memory used by a decoded image, or a tuple holding images"""
+    if isinstance(value, tuple):
+        return sum(decoded_size(v) for v in value)
+    if isinstance(value, Image.Image):
+        # PIL stores 3 and 4 band images with 4 bytes per pixel
+        return value.width * value.height * (1 if value.mode in ('1', 'L', 'P') else 4)
+    return 0
+
+class ImageCache:
+    """Decoded images shared by all tabs, evicted least recently used first past a byte budget
+
+    Entries are keyed by path, modification time and variant (a full decode, a display size...),
+    so a changed file is decoded again. Cached images are shared: callers must not modify them.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.resident = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(path, variant):
+        """Build the cache key of an image file, archive member or annotated crop"""
+        if isinstance(path, ArchiveMember):
+            return (str(path.source.path), path.member, path.source.path.stat().st_mtime_ns, variant)
+        if isinstance(path, AnnotatedCrop):
+            return (str(path.source), path.box, path.source.stat().st_mtime_ns, variant)
+        return (str(path), path.stat().st_mtime_ns, variant)
+
+    def get(self, path, variant, loader):
+        """Get a decoded image from the cache, calling loader(path) to decode it on a miss"""
+        try:
+            key = self.key(path, variant)
+        except OSError:
+            return loader(path)  # Let the loader report the missing file
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Decode outside the lock, two threads may decode the same image at worst
+        value = loader(path)
+        size = decoded_size(value)
+        if size > self.budget:
+            return value
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (value, size)
+                self.resident += size
+            while self.resident > self.budget:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.resident -= evicted_size
+        return value
+
+    def stats(self):
+        """Describe the hit rate and memory use"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups else 0
+            return (f"{hit_rate:.0%} hits ({self.hits}/{lookups}), "
+                    f"{self.resident / 2**20:.1f} of {self.budget / 2**20:.0f} MB resident")
+
+DECODED_IMAGES = ImageCache(IMAGE_CACHE.get('budget_mb', 512) * 2**20)
+
+def load_decoded(path):
+    """Fully decode an image (shared through DECODED_IMAGES, do not modify it)"""
+    img = open_image(path)
+    img.load()
+    return img
+
+def _box_iou(box, boxes):
+    """Compute the IoU of one (x, y, size) square against an array of squares"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[0] + box[2], boxes[:, 0] + boxes[:, 2])
+    y2 = np.minimum(box[1] + box[2], boxes[:, 1] + boxes[:, 2])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    return intersection / (box[2] ** 2 + boxes[:, 2] ** 2 - intersection)
+
+def propose_crop_boxes(path, count=3, proxy_size=160):
+    """Propose square crop boxes around sign-like (saturated red/blue, edgy) areas of an image
+    
+    Returns a list of (x1, y1, x2, y2, score) in original image coordinates, best first.
+    """
+    proxy, (original_width, original_height) = load_proxy(path, proxy_size)
+    
+    # Traffic signs are mostly saturated red or blue (PIL hue range is 0-255)
+    hsv = np.asarray(proxy.convert('HSV'))
+    hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    red = (hue < 12) | (hue > 240)
+    blue = (hue > 135) & (hue < 185)
+    color_mask = (red | blue) & (saturation > 90) & (value > 50)
+    
+    # Sign borders and pictograms produce strong edges
+    edges = np.asarray(proxy.convert('L').filter(ImageFilter.FIND_EDGES)) > 64
+    score_map = color_mask + 0.25 * edges
+    
+    total = score_map.sum()
+    if total == 0:
+        return []
+    
+    # Integral image to score every window in constant time
+    height, width = score_map.shape
+    integral = np.zeros((height + 1, width + 1))
+    integral[1:, 1:] = score_map.cumsum(0).cumsum(1)
+    
+    # Score square windows of several sizes on a grid
+    candidates = []
+    min_dimension = min(width, height)
+    for fraction in (0.15, 0.25, 0.35, 0.5, 0.7):
+        size = max(4, int(min_dimension * fraction))
+        step = max(1, size // 4)
+        ys = np.arange(0, height - size + 1, step)[:, None]
+        xs = np.arange(0, width - size + 1, step)[None, :]
+        inside = (integral[ys + size, xs + size] - integral[ys, xs + size]
+                  - integral[ys + size, xs] + integral[ys, xs])
+        # Favour windows that contain most of the mask while being mostly mask
+        score = (inside / total) * (inside / (size * size))
+        ys, xs = np.broadcast_arrays(ys, xs)
+        candidates.append(np.stack([xs.ravel(), ys.ravel(), np.full(xs.size, size), score.ravel()], axis=1))
+    candidates = np.concatenate(candidates)
+    candidates = candidates[np.argsort(-candidates[:, 3])]
+    
+    # Keep the best non-overlapping windows
+    proposals = []
+    while len(candidates) and len(proposals) < count:
+        best = candidates[0]
+        if best[3] <= 0:
+            break
+        proposals.append(best)
+        candidates = candidates[1:][_box_iou(best, candidates[1:, :3]) < 0.3]
+    
+    # Add a margin around the object and map back to original coordinates
+    scale = original_width / width
+    boxes = []
+    for x, y, size, score in proposals:
+        margin = size * 0.15
+        size = min(size + 2 * margin, min_dimension)
+        x = min(max(0, x - margin), width - size)
+        y = min(max(0, y - margin), height - size)
+        boxes.append((round(x * scale), round(y * scale),
+                      round((x + size) * scale), round((y + size) * scale), float(score)))
+    return boxes
+
+class CropProposer:
+    """Background worker computing crop box proposals ahead of the Crop tab cursor"""
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.count = CROP_PROPOSALS.get('count', 3)
+        self.proxy_size = CROP_PROPOSALS.get('proxy_size', 160)
+        
+        # Sidecar index: file name -> signature and proposed boxes
+        self.index = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable proposal index: {str(e)}")
+        
+        # Images the worker should process, in priority order
+        self.wanted = []
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _lookup(self, path):
+        """Get cached proposals for an image, or None if they are missing or stale"""
+        entry = self.index.get(path.name)
+        try:
+            if entry and entry['signature'] == file_signature(path):
+                return entry['boxes']
+        except OSError:
+            pass
+        return None
+    
+    def get(self, path):
+        """Get proposals for an image if they have already been computed"""
+        with self.condition:
+            return self._lookup(path)
+    
+    def request(self, paths):
+        """Replace the worker's queue with these images (current image first)"""
+        with self.condition:
+            self.wanted = [p for p in paths if self._lookup(p) is None]
+            self.condition.notify()
+    
+    def _run(self):
+        """Worker loop, never touches Tk"""
+        while True:
+            with self.condition:
+                while not self.wanted:
+                    self.condition.wait()
+                path = self.wanted.pop(0)
+            
+            try:
+                signature = file_signature(path)
+            except OSError:
+                continue
+            
+            try:
+                boxes = propose_crop_boxes(path, self.count, self.proxy_size)
+            except Exception as e:
+                # Remember the failure so the image is not retried over and over
+                print(f"Error computing crop proposals for {path}: {str(e)}")
+                boxes = []
+            
+            with self.condition:
+                self.index[path.name] = {'signature': signature, 'boxes': boxes}
+                save_now = not self.wanted
+            
+            # Persist once the lookahead is drained
+            if save_now:
+                try:
+                    with self.condition:
+                        snapshot = dict(self.index)
+                    atomic_write_json(self.index_path, snapshot)
+                except OSError as e:
+                    print(f"Error saving crop proposals: {str(e)}")
+
+def parse_category(stem):
+    """Get the category prefix a file name starts with, or None"""
+    # Longest prefix first, some prefixes contain underscores
+    for _, prefix in sorted(CATEGORIES, key=lambda c: len(c[1]), reverse=True):
+        if stem.startswith(f"{prefix}_"):
+            return prefix
+    return None
+
+# Feature vector: 4x4 tiny image (48 values) + 4x4x4 colour histogram (64 values)
+FEATURE_SIZE = 48 + 64
+
+def image_features(img):
+    """Compute a small colour descriptor of an image for nearest-neighbour search"""
+    rgb = img.convert('RGB').resize((32, 32), Image.Resampling.BOX)
+    pixels = np.asarray(rgb)
+    
+    # Coarse layout, mean-centered so lighting matters less
+    tiny = pixels.reshape(4, 8, 4, 8, 3).mean(axis=(1, 3)).ravel()
+    tiny -= tiny.mean()
+    tiny /= np.linalg.norm(tiny) or 1
+    
+    # Colour distribution (square root so cosine similarity is the Hellinger kernel)
+    bins = pixels.reshape(-1, 3) // 64
+    hist = np.bincount(bins[:, 0] * 16 + bins[:, 1] * 4 + bins[:, 2], minlength=64)
+    hist = np.sqrt(hist / hist.sum())
+    
+    features = np.concatenate([0.5 * tiny, hist]).astype(np.float32)
+    return features / np.linalg.norm(features)
+
+class CategoryIndex:
+    """Incremental nearest-neighbour index of categorized images, used to pre-select categories"""
+    def __init__(self, folder):
+        folder.mkdir(parents=True, exist_ok=True)
+        self.features_path = folder / "features.f32"
+        self.labels_path = folder / "labels.jsonl"
+        self.lock = threading.Lock()
+        self.category_ids = {prefix: i for i, (_, prefix) in enumerate(CATEGORIES)}
+        
+        # Load the persisted rows: one feature row and one label line per image
+        labels = []
+        partial = False
+        if self.labels_path.exists():
+            with open(self.labels_path, 'rb') as f:
+                data = f.read()
+            partial = bool(data) and not data.endswith(b'\n')
+            for line in data.decode('utf-8', errors='replace').splitlines():
+                try:
+                    label = json.loads(line)
+                    labels.append({'name': label['name'], 'category': label['category']})
+                except (ValueError, KeyError, TypeError):
+                    partial = True  # Partial line left by a crash, the rows after it can't be matched
+                    break
+        features = np.empty((0, FEATURE_SIZE), dtype=np.float32)
+        if self.features_path.exists():
+            features = np.fromfile(self.features_path, dtype=np.float32)
+            features = features[:len(features) // FEATURE_SIZE * FEATURE_SIZE].reshape(-1, FEATURE_SIZE)
+        
+        # A crash between or during the two appends leaves the files out of step, truncate both to the shared rows
+        self.count = min(len(labels), len(features))
+        features_bytes = self.features_path.stat().st_size if self.features_path.exists() else 0
+        if partial or len(labels) != self.count or features_bytes != self.count * FEATURE_SIZE * 4:
+            labels = labels[:self.count]
+            features = features[:self.count]
+            features.tofile(self.features_path)
+            with open(self.labels_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(label) + "\n" for label in labels)
+        
+        # Preallocated matrix, grown by doubling
+        self.matrix = np.empty((max(1024, self.count * 2), FEATURE_SIZE), dtype=np.float32)
+        self.matrix[:self.count] = features
+        self.labels = np.full(len(self.matrix), -1, dtype=np.int64)
+        self.labels[:self.count] = [self.category_ids.get(label['category'], -1) for label in labels]
+        self.names = {label['name'] for label in labels}
+    
+    def __contains__(self, name):
+        return name in self.names
+    
+    def add(self, name, category, features):
+        """Add an image to the index and append it to the persisted files"""
+        with self.lock:
+            if name in self.names:
+                return
+            
+            if self.count == len(self.matrix):
+                self.matrix = np.concatenate([self.matrix, np.empty_like(self.matrix)])
+                self.labels = np.concatenate([self.labels, np.full(len(self.labels), -1, dtype=np.int64)])
+            
+            self.matrix[self.count] = features
+            self.labels[self.count] = self.category_ids.get(category, -1)
+            self.count += 1
+            self.names.add(name)
+            
+            with open(self.features_path, 'ab') as f:
+                f.write(features.astype(np.float32).tobytes())
+            with open(self.labels_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'name': name, 'category': category}) + "\n")
+    
+    def query(self, features, k=15):
+        """Predict a category with a similarity-weighted vote of the k nearest images
+        
+        Returns (category_prefix, confidence) or (None, 0.0) if the index is empty.
+        """
+        with self.lock:
+            matrix = self.matrix[:self.count]
+            labels = self.labels[:self.count]
+        if not len(matrix):
+            return None, 0.0
+        
+        similarities = matrix @ features
+        k = min(k, len(similarities))
+        nearest = np.argpartition(-similarities, k - 1)[:k]
+        nearest = nearest[labels[nearest] >= 0]
+        if not len(nearest):
+            return None, 0.0
+        
+        votes = np.bincount(labels[nearest], weights=np.clip(similarities[nearest], 0, None),
+                            minlength=len(CATEGORIES))
+        if votes.sum() <= 0:
+            return None, 0.0
+        best = int(votes.argmax())
+        return CATEGORIES[best][1], float(votes[best] / votes.sum())
+    
+    def sync(self, folder):
+        """Index the categorized images that are not in the index yet (run in a thread)"""
+        for path in sorted(folder.glob("*")):
+            if path.suffix.lower() not in IMAGE_EXTENSIONS or path.name in self.names:
+                continue
+            category = parse_category(path.stem)
+            if category is None:
+                continue
+            try:
+                proxy, _ = load_proxy(path, 64)
+                self.add(path.name, category, image_features(proxy))
+            except Exception as e:
+                print(f"Error indexing {path}: {str(e)}")
+
+def _sample_op(op, variant, rng):
+    """Draw the parameters of one variant of an augmentation op"""
+    if op['op'] == 'rotate':
+        low, high = op['intervals'][variant] if 'intervals' in op else op['range']
+        return {'angle': rng.uniform(low, high), 'expand': op.get('expand', True)}
+    if op['op'] == 'flip':
+        return {'flip': rng.random() < op.get('probability', 0.5)}
+    if op['op'] == 'scale':
+        return {'scale': rng.uniform(*op.get('range', (1, 1)))}
+    if op['op'] == 'color_jitter':
+        return {name: rng.uniform(*op.get(name, (1, 1))) for name in ('brightness', 'contrast', 'saturation')}
+    if op['op'] == 'blur':
+        return {'blur': rng.uniform(*op.get('radius', (0, 0)))}
+
+def sample_augmentations(ops, rng):
+    """Draw the parameters of every output of the pipeline (product of the ops' fan-outs)"""
+    variants = [[_sample_op(op, i, rng) for i in range(op['fan_out'])] for op in ops]
+    outputs = []
+    for combination in itertools.product(*variants):
+        params = {}
+        for op_params in combination:
+            params.update(op_params)
+        outputs.append(params)
+    return outputs
+
+def apply_augmentation(img, params):
+    """Apply one set of augmentation parameters with fused transforms
+    
+    Rotation, flip and scale are combined into a single affine resampling,
+    brightness and contrast into a single lookup table.
+    """
+    angle = params.get('angle', 0.0)
+    flip = params.get('flip', False)
+    scale = params.get('scale', 1.0)
+    
+    if angle or flip or scale != 1.0:
+        # Inverse mapping (output -> input), same rotation convention as Image.rotate
+        radians = -math.radians(angle)
+        inverse = np.array([[math.cos(radians), math.sin(radians)],
+                            [-math.sin(radians), math.cos(radians)]]) / scale
+        if flip:
+            inverse[0] = -inverse[0]
+        
+        # Output size: bounding box of the transformed image, or the input size
+        width, height = img.size
+        if params.get('expand', True):
+            # Rounded outwards like Image.rotate(expand=True)
+            corners = np.array([[-width, -height], [width, -height], [width, height], [-width, height]]) / 2
+            transformed = corners @ np.linalg.inv(inverse).T
+            out_width = math.ceil(transformed[:, 0].max()) - math.floor(transformed[:, 0].min())
+            out_height = math.ceil(transformed[:, 1].max()) - math.floor(transformed[:, 1].min())
+        else:
+            out_width, out_height = width, height
+        
+        # Map the output center onto the input center
+        offset = np.array([width, height]) / 2 - inverse @ (np.array([out_width, out_height]) / 2)
+        data = (inverse[0, 0], inverse[0, 1], offset[0], inverse[1, 0], inverse[1, 1], offset[1])
+        img = img.transform((out_width, out_height), Image.Transform.AFFINE, data,
+                            resample=Image.Resampling.BICUBIC)
+    
+    brightness = params.get('brightness', 1.0)
+    contrast = params.get('contrast', 1.0)
+    if brightness != 1.0 or contrast != 1.0:
+        # Same as ImageEnhance.Contrast followed by ImageEnhance.Brightness, in one pass
+        mean = np.asarray(img.convert('L')).mean()
+        levels = np.arange(256)
+        table = np.clip(((levels - mean) * contrast + mean) * brightness, 0, 255).round().astype(np.uint8)
+        img = img.point(table.tolist() * len(img.getbands()))
+    
+    saturation = params.get('saturation', 1.0)
+    if saturation != 1.0:
+        img = ImageEnhance.Color(img).enhance(saturation)
+    
+    if params.get('blur'):
+        img = img.filter(ImageFilter.GaussianBlur(params['blur']))
+    
+    return img
+
+def augment_file(path, output_folder, pipeline, settings=None, seed=None):
+    """Run the whole augmentation pipeline on one image: one decode, one encode per output
+    
+    The source is downscaled once to the output size before being augmented.
+    Runs in a worker process. Returns the number of images written.
+    """
+    source = load_for_output(path, settings)
+    
+    rng = random.Random(seed)
+    extension = output_extension(path, settings)
+    outputs = sample_augmentations(pipeline['ops'], rng)
+    for n, params in enumerate(outputs, 1):
+        augmented = apply_augmentation(source, params)
+        encode_image(augmented, output_folder / f"{path.stem}_{pipeline['suffix']}_{n}{extension}", settings)
+    return len(outputs)
+
+def augmentation_done(path, output_folder, pipeline, settings=None):
+    """Tell whether the augmented versions of an image have already been written"""
+    return (output_folder / f"{path.stem}_{pipeline['suffix']}_1{output_extension(path, settings)}").exists()
+
+class StageScheduler:
+    """Runs the automatic stages (augmentation, normalization, export) on multi-cropped images as soon as they are saved
+    
+    Events are queued by the UI without blocking. A dispatcher thread submits them to a
+    process pool, with at most max_pending images in flight (backpressure: the queue
+    grows instead of the pool).
+    """
+    def __init__(self, output_folder, pipeline, settings, on_written=None):
+        self.output_folder = output_folder
+        self.pipeline = pipeline
+        self.settings = settings
+        self.on_written = on_written  # Called with {source path: images written} from a pool thread
+        
+        self.events = queue.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=SCHEDULER.get('workers', 2))
+        self.slots = threading.BoundedSemaphore(SCHEDULER.get('max_pending', 4))
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.done = 0
+        self.errors = []
+        self.pending = set()  # Images queued or being processed
+        
+        self.thread = threading.Thread(target=self._dispatch, daemon=True)
+        self.thread.start()
+    
+    def submit(self, path):
+        """Queue a newly written image (never blocks)"""
+        with self.lock:
+            self.pending.add(path)
+        self.events.put(path)
+    
+    def is_pending(self, path):
+        """Check whether an image is queued or being processed"""
+        with self.lock:
+            return path in self.pending
+    
+    def status(self):
+        """Get (queued images, images being processed, images done, errors)"""
+        with self.lock:
+            return self.events.qsize(), self.in_flight, self.done, len(self.errors)
+    
+    def _dispatch(self):
+        """Dispatcher loop: wait for a free slot, then send the next image"""
+        while True:
+            path = self.events.get()
+            if path is None:
+                return
+            self.slots.acquire()
+            
+            try:
+                future = self.executor.submit(augment_file, path, self.output_folder, self.pipeline, self.settings)
+            except RuntimeError:
+                # Executor shut down
+                self.slots.release()
+                with self.lock:
+                    self.pending.discard(path)
+                return
+            
+            with self.lock:
+                self.in_flight += 1
+            future.add_done_callback(lambda f, path=path: self._finished(f, path))
+    
+    def _finished(self, future, path):
+        """Release the slot of a finished image and record its outcome"""
+        written = {}
+        with self.lock:
+            self.in_flight -= 1
+            self.pending.discard(path)
+            if future.cancelled():
+                pass
+            elif future.exception():
+                self.errors.append(f"{path.name}: {str(future.exception())}")
+                print(f"Error augmenting {path.name}: {str(future.exception())}")
+            else:
+                written = {path: future.result()}
+                self.done += 1
+        if self.on_written and written:
+            self.on_written(written)
+        self.slots.release()
+    
+    def shutdown(self):
+        """Stop dispatching; queued images are picked up later by the rotator button"""
+        self.events.put(None)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ArchiveSource:
+    """ZIP or tar archive of input images, read without extracting it
+    
+    Members are listed from the ZIP central directory (or the tar headers) and decoded
+    on demand. Which members were kept or skipped is logged next to the cache, so the
+    archive itself is never rewritten.
+    """
+    def __init__(self, path, log_folder):
+        self.path = path
+        self.lock = threading.Lock()
+        
+        if zipfile.is_zipfile(path):
+            self.archive = zipfile.ZipFile(path)
+            names = [info.filename for info in self.archive.infolist() if not info.is_dir()]
+        else:
+            self.archive = tarfile.open(path)
+            names = [member.name for member in self.archive.getmembers() if member.isfile()]
+        self.names = sorted(name for name in names if PurePosixPath(name).suffix.lower() in IMAGE_EXTENSIONS)
+        
+        # Members already handled: name -> "kept" or "skipped", one JSON line per decision
+        log_folder.mkdir(parents=True, exist_ok=True)
+        self.log_path = log_folder / f"{path.name}.jsonl"
+        self.handled = {}
+        if self.log_path.exists():
+            with open(self.log_path, 'rb') as f:
+                data = f.read()
+            for line in data.decode('utf-8', errors='replace').splitlines():
+                try:
+                    entry = json.loads(line)
+                    self.handled[entry['name']] = entry['status']
+                except (ValueError, KeyError, TypeError):
+                    continue  # Partial line left by a crash
+            # Never append to a partial line
+            if data and not data.endswith(b'\n'):
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+        
+        # Read-ahead cache of member bytes, filled by a background thread
+        self.cache = OrderedDict()
+        self.cache_size = ARCHIVES.get('read_ahead', 8) * 2
+        self.wanted = queue.Queue()
+        threading.Thread(target=self._read_ahead, daemon=True).start()
+    
+    def members(self):
+        """Get the members that have not been kept or skipped yet"""
+        return [ArchiveMember(self, name) for name in self.names if name not in self.handled]
+    
+    def read(self, name):
+        """Get the bytes of a member, from the read-ahead cache if possible"""
+        with self.lock:
+            if name in self.cache:
+                self.cache.move_to_end(name)
+                return self.cache[name]
+            if isinstance(self.archive, zipfile.ZipFile):
+                data = self.archive.read(name)
+            else:
+                data = self.archive.extractfile(name).read()
+            self.cache[name] = data
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return data
+    
+    def prefetch(self, names):
+        """Read members in the background before they are needed"""
+        for name in names:
+            self.wanted.put(name)
+    
+    def _read_ahead(self):
+        """Read-ahead loop, never touches Tk"""
+        while True:
+            name = self.wanted.get()
+            try:
+                self.read(name)
+            except Exception as e:
+                print(f"Error reading {name} from {self.path}: {str(e)}")
+    
+    def mark(self, name, status):
+        """Record that a member was kept or skipped"""
+        self.handled[name] = status
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'name': name, 'status': status}) + '\n')
+        with self.lock:
+            self.cache.pop(name, None)
+
+class ArchiveMember:
+    """Image inside an archive, usable where the categorizer expects a Path"""
+    def __init__(self, source, member):
+        self.source = source
+        self.member = member
+        member_path = PurePosixPath(member)
+        self.name = member_path.name
+        self.stem = member_path.stem
+        self.suffix = member_path.suffix
+    
+    def __eq__(self, other):
+        return isinstance(other, ArchiveMember) and (self.source.path, self.member) == (other.source.path, other.member)
+    
+    def __hash__(self):
+        return hash((self.source.path, self.member))
+    
+    def __repr__(self):
+        return f"ArchiveMember({self.source.path.name}:{self.member})"
+    
+    def read_bytes(self):
+        return self.source.read(self.member)
+    
+    def rename(self, target):
+        """Extract the member to target (only kept images are extracted)"""
+        tmp_path = target.with_name(target.name + '.tmp')
+        tmp_path.write_bytes(self.read_bytes())
+        os.replace(tmp_path, target)
+        self.source.mark(self.member, 'kept')
+        return target
+    
+    def unlink(self):
+        """Skip the member, the archive is left untouched"""
+        self.source.mark(self.member, 'skipped')
+
+def list_input_images(folder, log_folder):
+    """List the images to categorize: image files, then the members of the archives of the folder"""
+    images = sorted(f for f in folder.glob("*") if f.suffix.lower() in IMAGE_EXTENSIONS)
+    archives = sorted({f for pattern in ARCHIVE_PATTERNS for f in folder.glob(pattern)})
+    for archive_path in archives:
+        try:
+            images.extend(ArchiveSource(archive_path, log_folder).members())
+        except Exception as e:
+            print(f"Error opening archive {archive_path}: {str(e)}")
+    return images
+
+def prefetch_images(paths):
+    """Start reading the archive members among these images in the background"""
+    for path in paths:
+        if isinstance(path, ArchiveMember):
+            path.source.prefetch([path.member])
+
+def validate_image(path, min_size, max_pixels):
+    """Check that an image fully decodes and is large enough, returns the reason it is rejected or None"""
+    try:
+        # verify() catches broken structures, load() catches truncated pixel data
+        with Image.open(path) as img:
+            img.verify()
+        with Image.open(path) as img:
+            width, height = img.size
+            if width * height > max_pixels:
+                return f"too large: {width}x{height}"
+            img.load()
+    except Exception as e:
+        return f"cannot decode: {str(e)}"
+
+    if width < min_size or height < min_size:
+        return f"too small: {width}x{height} (minimum {min_size})"
+    return None
+
+def quarantine_image(path, quarantine_folder, reason):
+    """Move a rejected image to the quarantine folder and log why"""
+    quarantine_folder.mkdir(parents=True, exist_ok=True)
+    target = quarantine_folder / path.name
+    counter = 1
+    while target.exists():
+        target = quarantine_folder / f"{path.stem}_{counter}{path.suffix}"
+        counter += 1
+    path.rename(target)
+
+    with open(quarantine_folder / "reasons.log", 'a', encoding='utf-8') as f:
+        f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{target.name}\t{reason}\n")
+
+class IngestValidator:
+    """Checks the images of the input folder in the background, quarantining the unusable ones
+
+    Files are checked in parallel on a process pool. The signatures of the files that passed
+    are cached, so later startups only check what was added since. The categorizer hides
+    the files still being checked and picks them up from the results queue once they pass.
+    """
+    def __init__(self, folder, quarantine_folder, cache_path, settings):
+        self.quarantine_folder = quarantine_folder
+        self.cache_path = cache_path
+        self.settings = settings
+        self.results = queue.Queue()  # (path, passed)
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.executor = None
+
+        self.checked = {}
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    self.checked = json.load(f)
+            except (OSError, ValueError):
+                self.checked = {}
+
+        images = sorted(f for f in folder.glob("*") if f.suffix.lower() in IMAGE_EXTENSIONS)
+        self.signatures = {f.name: file_signature(f) for f in images}
+        self.to_check = [f for f in images if self.checked.get(f.name) != self.signatures[f.name]]
+        self.pending = set(self.to_check)
+        self.total = len(self.to_check)
+        self.quarantined = 0
+
+        # Forget the files that left the folder
+        self.checked = {name: signature for name, signature in self.checked.items()
+                        if self.signatures.get(name) == signature}
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def is_pending(self, path):
+        """Tell whether an image has not been checked yet"""
+        with self.lock:
+            return path in self.pending
+
+    def progress(self):
+        """Get (images checked, images to check, images quarantined)"""
+        with self.lock:
+            return self.total - len(self.pending), self.total, self.quarantined
+
+    def _run(self):
+        """Check the new images, the results come in folder order"""
+        if self.to_check:
+            min_size = self.settings.get('min_size', 0)
+            max_pixels = self.settings.get('max_pixels', Image.MAX_IMAGE_PIXELS)
+            self.executor = ProcessPoolExecutor(max_workers=self.settings.get('workers'))
+            try:
+                reasons = self.executor.map(validate_image, self.to_check, itertools.repeat(min_size),
+                                            itertools.repeat(max_pixels), chunksize=16)
+                for count, (path, reason) in enumerate(zip(self.to_check, reasons), 1):
+                    if self.stop_event.is_set():
+                        break
+                    passed = reason is None
+                    if passed:
+                        self.checked[path.name] = self.signatures[path.name]
+                    else:
+                        try:
+                            quarantine_image(path, self.quarantine_folder, reason)
+                        except Exception as e:
+                            # Left in place but never shown
+                            print(f"Error quarantining {path}: {str(e)}")
+                    with self.lock:
+                        self.pending.discard(path)
+                        self.quarantined += not passed
+                    self.results.put((path, passed))
+
+                    # Save from time to time so a crash doesn't lose a long first check
+                    if count % 200 == 0:
+                        atomic_write_json(self.cache_path, self.checked)
+            except Exception:
+                # Checks cancelled by stop()
+                if not self.stop_event.is_set():
+                    raise
+            finally:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+        atomic_write_json(self.cache_path, self.checked)
+        if self.quarantined > 0:
+            print(f"Moved {self.quarantined} unusable images to {self.quarantine_folder} (see reasons.log)")
+
+    def stop(self):
+        """Stop checking, the unchecked images are checked at the next startup"""
+        self.stop_event.set()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+def sample_crop_positions(width, height, count=9, rng=None):
+    """Pick diverse square crops covering the center of the image
+    
+    A large set of candidates is drawn at once, candidates that miss too much of the
+    central region are dropped. With max_iou set, candidates are then taken in random
+    order, rejecting the ones overlapping a kept crop by more than max_iou. When fewer
+    than count remain (or without max_iou), greedy farthest-point selection on the IoU
+    matrix completes the set: each new crop is the candidate overlapping the already
+    picked ones the least. Returns (x, y, size, size) tuples.
+    """
+    rng = rng or np.random.default_rng()
+    min_dimension = min(width, height)
+    min_crop_size = max(1, int(min_dimension * MULTI_CROP.get('min_size', 0.4)))
+    max_crop_size = max(min_crop_size, int(min_dimension * MULTI_CROP.get('max_size', 0.6)))
+    
+    # Candidates
+    total = max(count, MULTI_CROP.get('candidates', 256))
+    sizes = rng.integers(min_crop_size, max_crop_size + 1, total)
+    xs = (rng.random(total) * (width - sizes + 1)).astype(int)
+    ys = (rng.random(total) * (height - sizes + 1)).astype(int)
+    
+    # Coverage rule: share of the central square (where the object is) inside each candidate
+    center_size = min_dimension * MULTI_CROP.get('center_size', 0.3)
+    cx1, cy1 = (width - center_size) / 2, (height - center_size) / 2
+    covered_x = np.clip(np.minimum(xs + sizes, cx1 + center_size) - np.maximum(xs, cx1), 0, None)
+    covered_y = np.clip(np.minimum(ys + sizes, cy1 + center_size) - np.maximum(ys, cy1), 0, None)
+    coverage = covered_x * covered_y / (center_size ** 2) if center_size > 0 else np.ones(total)
+    
+    keep = coverage >= MULTI_CROP.get('center_coverage', 0.5)
+    if keep.sum() < count:
+        # Not enough candidates satisfy the rule, take the best covering ones
+        keep = np.zeros(total, dtype=bool)
+        keep[np.argsort(-coverage)[:count]] = True
+    xs, ys, sizes = xs[keep], ys[keep], sizes[keep]
+    
+    # Pairwise IoU matrix
+    x2, y2 = xs + sizes, ys + sizes
+    overlap_x = np.clip(np.minimum(x2[:, None], x2[None, :]) - np.maximum(xs[:, None], xs[None, :]), 0, None)
+    overlap_y = np.clip(np.minimum(y2[:, None], y2[None, :]) - np.maximum(ys[:, None], ys[None, :]), 0, None)
+    intersection = (overlap_x * overlap_y).astype(np.float64)
+    areas = (sizes.astype(np.float64)) ** 2
+    iou = intersection / (areas[:, None] + areas[None, :] - intersection)
+    
+    # Overlap rule: random candidates overlapping every kept crop by at most max_iou
+    order = rng.permutation(len(xs))
+    selected = [int(order[0])]
+    max_iou = MULTI_CROP.get('max_iou')
+    if max_iou is not None:
+        for i in order[1:]:
+            if len(selected) == count:
+                break
+            if iou[i, selected].max() <= max_iou:
+                selected.append(int(i))
+    
+    # Greedy farthest-point selection for the remaining crops
+    closest = iou[selected].max(axis=0)
+    while len(selected) < min(count, len(xs)):
+        closest[selected] = np.inf
+        best = int(np.argmin(closest))
+        selected.append(best)
+        closest = np.maximum(closest, iou[best])
+    
+    return [(int(xs[i]), int(ys[i]), int(sizes[i]), int(sizes[i])) for i in selected]
+
+class ProgressStore:
+    """Persistent record of the sources a stage has finished, so restarts skip finished work
+    
+    Entries map a source stem to its status ("cropped", "multi_cropped", "skipped")
+    and number of outputs. Every update rewrites the file atomically.
+    """
+    def __init__(self, path, done_status, output_folder):
+        self.path = path
+        self.entries = None
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = dict(json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Error loading {self.path}, rebuilding it from the outputs: {e}")
+        if self.entries is None:
+            # First run or unreadable file: recover the progress from the outputs
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            outputs = {}
+            for f in list_images(output_folder):
+                if '_crop_' in f.stem:
+                    base_name = f.stem.rsplit('_crop_', 1)[0]
+                    outputs[base_name] = outputs.get(base_name, 0) + 1
+            self.entries = {name: {'status': done_status, 'outputs': count} for name, count in outputs.items()}
+            atomic_write_json(self.path, self.entries)
+    
+    def status(self, name):
+        """Get the status of a source, or None if it has not been handled yet"""
+        entry = self.entries.get(name)
+        return entry['status'] if entry else None
+    
+    def is_done(self, name):
+        return name in self.entries
+    
+    def outputs(self, name):
+        entry = self.entries.get(name)
+        return entry['outputs'] if entry else 0
+    
+    def set(self, name, status, outputs=0):
+        """Record the status of a source"""
+        self.entries[name] = {'status': status, 'outputs': outputs}
+        atomic_write_json(self.path, self.entries)
+    
+    def first_pending(self, paths):
+        """Get the index of the first unfinished source (0 if all are finished)"""
+        return next((i for i, path in enumerate(paths) if path.stem not in self.entries), 0)
+
+def list_images(folder):
+    """List the images of a stage folder, raw store files taking precedence over encoded copies"""
+    images = {}
+    for f in sorted(folder.glob("*")):
+        if f.suffix == RAW_EXTENSION:
+            images[f.stem] = f
+        elif f.suffix.lower() in IMAGE_EXTENSIONS:
+            images.setdefault(f.stem, f)
+    return list(images.values())
+
+class AnnotationStore:
+    """Crop boxes drawn in the cropper, one JSON record per line in images/annotations.jsonl
+
+    A record holds the crop id (the name the crop file gets), the source picture relative
+    to the images folder, its category, the box in original pixels, the source size, the
+    author and the crop file if one was saved. Later records with the same id win.
+    """
+    def __init__(self, path, base_folder):
+        self.path = path
+        self.base_folder = base_folder
+        self.lock = threading.Lock()
+        self.records = {}
+
+        if path.exists():
+            with open(path, 'rb') as f:
+                data = f.read()
+            for line in data.decode('utf-8', errors='replace').splitlines():
+                try:
+                    record = json.loads(line)
+                    self.records[record['id']] = record
+                except (ValueError, KeyError, TypeError):
+                    continue  # Partial line left by a crash
+            # Never append to a partial line
+            if data and not data.endswith(b'\n'):
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+
+    def add(self, record):
+        """Append a record to the file"""
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            self.records[record['id']] = record
+
+    def ids(self, prefix):
+        """Get the ids starting with a prefix"""
+        with self.lock:
+            return [crop_id for crop_id in self.records if crop_id.startswith(prefix)]
+
+    def entries(self):
+        """Get the recorded crops as images the multi-cropper can open"""
+        with self.lock:
+            records = list(self.records.values())
+        return [AnnotatedCrop(record, self.base_folder) for record in records]
+
+    def to_coco(self):
+        """Build a COCO detection dataset with one image per source picture"""
+        with self.lock:
+            records = sorted(self.records.values(), key=lambda r: r['id'])
+        category_ids = {prefix: i + 1 for i, (_, prefix) in enumerate(CATEGORIES)}
+        sources = sorted({r['source'] for r in records})
+        image_ids = {source: i + 1 for i, source in enumerate(sources)}
+        sizes = {r['source']: r['size'] for r in records}
+
+        annotations = []
+        for record in records:
+            if record.get('category') not in category_ids:
+                continue
+            x1, y1, x2, y2 = record['box']
+            annotations.append({
+                'id': len(annotations) + 1,
+                'image_id': image_ids[record['source']],
+                'category_id': category_ids[record['category']],
+                'bbox': [x1, y1, x2 - x1, y2 - y1],
+                'area': (x2 - x1) * (y2 - y1),
+                'iscrowd': 0,
+            })
+
+        return {
+            'images': [{'id': image_ids[source], 'file_name': source,
+                        'width': sizes[source][0], 'height': sizes[source][1]} for source in sources],
+            'categories': [{'id': category_ids[prefix], 'name': prefix} for _, prefix in CATEGORIES],
+            'annotations': annotations,
+        }
+
+    def export_yolo(self, folder):
+        """Write one YOLO label file per source picture (class, normalized center and size) and classes.txt"""
+        with self.lock:
+            records = sorted(self.records.values(), key=lambda r: r['id'])
+        class_ids = {prefix: i for i, (_, prefix) in enumerate(CATEGORIES)}
+
+        labels = {}
+        for record in records:
+            if record.get('category') not in class_ids:
+                continue
+            x1, y1, x2, y2 = record['box']
+            width, height = record['size']
+            labels.setdefault(record['source'], []).append(
+                f"{class_ids[record['category']]} {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} "
+                f"{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}")
+
+        folder.mkdir(parents=True, exist_ok=True)
+        with open(folder / "classes.txt", 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{prefix}\n" for _, prefix in CATEGORIES))
+        for source, lines in labels.items():
+            with open(folder / f"{PurePosixPath(source).stem}.txt", 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        return len(labels)
+
+class AnnotatedCrop:
+    """Crop recorded as a box on its source picture, usable where the multi-cropper expects a Path"""
+    def __init__(self, record, base_folder):
+        self.record = record
+        self.source = base_folder / record['source']
+        self.box = tuple(record['box'])
+        self.stem = record['id']
+        self.suffix = self.source.suffix
+        self.name = f"{self.stem}{self.suffix}"
+
+    def __eq__(self, other):
+        return isinstance(other, AnnotatedCrop) and self.stem == other.stem
+
+    def __hash__(self):
+        return hash(self.stem)
+
+    def __repr__(self):
+        return f"AnnotatedCrop({self.stem})"
+
+    def decode(self):
+        """Decode the box from the source picture, at the size a crop file would have"""
+        return decode_region(self.source, self.box, output_settings('cropped'))
+
+def list_crops(folder, annotations):
+    """List the crops of the cropped folder, plus the annotated crops saved without a file
+
+    Records whose crop file was deleted are left out, the user removed them on purpose.
+    """
+    crops = list_images(folder)
+    stems = {f.stem for f in crops}
+    crops.extend(entry for entry in annotations.entries() if entry.record['crop'] is None and entry.stem not in stems)
+    return sorted(crops, key=lambda f: f.name)
+
+# Stages counted by the statistics, in pipeline order
+STAGES = ('categorized', 'cropped', 'multi_cropped', 'rotated')
+
+def parse_author(stem, category):
+    """Get the author an image name starts with (<category>_<author>_<index>...), or None"""
+    if not category:
+        return None
+    parts = stem[len(category) + 1:].split('_')
+    # Older names have no author: <category>_<index>
+    for i, part in enumerate(parts):
+        if part.isdigit():
+            return '_'.join(parts[:i]) or None
+    return None
+
+class StatsIndex:
+    """Image counts per stage, category and author, kept in images/.cache/stats.json
+
+    The counts are updated as images are saved, so the statistics never need a folder
+    listing. rebuild() recounts everything, scanning the stage folders in parallel.
+    """
+    def __init__(self, path, folders, annotations):
+        self.path = path
+        self.folders = folders  # stage -> folder
+        self.annotations = annotations
+        self.lock = threading.Lock()
+        self.counts = None
+
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.counts = json.load(f)['stages']
+            except (OSError, ValueError, KeyError):
+                self.counts = None
+        if self.counts is None:
+            self.rebuild()
+
+    @staticmethod
+    def _count(counts, stems, amount=1):
+        """Add images to a {category: {author: count}} mapping"""
+        for stem in stems:
+            category = parse_category(stem)
+            author = parse_author(stem, category)
+            by_author = counts.setdefault(category or 'unknown', {})
+            by_author[author or 'unknown'] = by_author.get(author or 'unknown', 0) + amount
+
+    def add(self, stage, stems, amount=1):
+        """Count new images of a stage (amount images per stem, rotated outputs are counted by source)"""
+        if not stems:
+            return
+        with self.lock:
+            self._count(self.counts.setdefault(stage, {}), stems, amount)
+            atomic_write_json(self.path, {'stages': self.counts})
+
+    def _scan(self, stage):
+        """Count the images of a stage folder"""
+        if stage == 'cropped':
+            images = list_crops(self.folders[stage], self.annotations)
+        else:
+            images = list_images(self.folders[stage])
+        counts = {}
+        self._count(counts, [f.stem for f in images])
+        return counts
+
+    def rebuild(self):
+        """Recount every stage from the folders, one thread per folder"""
+        with ThreadPoolExecutor(max_workers=len(STAGES)) as executor:
+            counts = dict(zip(STAGES, executor.map(self._scan, STAGES)))
+        with self.lock:
+            self.counts = counts
+            atomic_write_json(self.path, {'stages': self.counts})
+
+    def rows(self):
+        """Get (category, author, counts per stage) rows, sorted by category and author"""
+        with self.lock:
+            keys = {(category, author) for by_category in self.counts.values()
+                    for category, by_author in by_category.items() for author in by_author}
+            return [(category, author, [self.counts.get(stage, {}).get(category, {}).get(author, 0)
+                                        for stage in STAGES])
+                    for category, author in sorted(keys)]
+
+    def format_table(self):
+        """Format the counts as a text table, with the totals of each stage"""
+        lines = [f"{'Category':<24}{'Author':<16}" + ''.join(f"{stage:>15}" for stage in STAGES)]
+        totals = [0] * len(STAGES)
+        for category, author, counts in self.rows():
+            lines.append(f"{category:<24}{author:<16}" + ''.join(f"{n:>15}" for n in counts))
+            totals = [total + n for total, n in zip(totals, counts)]
+        lines.append(f"{'Total':<40}" + ''.join(f"{n:>15}" for n in totals))
+        return '\n'.join(lines)
+
 class ImageApp(tk.Tk):
     """Main application class with navigation"""
     def __init__(self):
@@ -85,6 +1485,9 @@ class ImageApp(tk.Tk):
         self.cropped_folder = self.base_folder / "2_cropped"
         self.multi_cropped_folder = self.base_folder / "3_multi_cropped"
         self.rotated_folder = self.base_folder / "4_rotated"
+        self.cache_folder = self.base_folder / ".cache"
+        self.quarantine_folder = self.base_folder / "quarantine"
+        self.annotations_path = self.base_folder / "annotations.jsonl"
         
         # Create folders if they don't exist
         self.to_process_folder.mkdir(parents=True, exist_ok=True)
@@ -92,10 +1495,24 @@ class ImageApp(tk.Tk):
         self.cropped_folder.mkdir(parents=True, exist_ok=True)
         self.multi_cropped_folder.mkdir(parents=True, exist_ok=True)
         self.rotated_folder.mkdir(parents=True, exist_ok=True)
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
         
         # Convert HEIC images to JPG at startup
         convert_heic_to_jpg(self.to_process_folder)
         
+        # Move the corrupt or too small images out of the way in the background,
+        # the categorizer only shows them once they passed
+        self.ingest = None
+        if INGEST.get('enabled', True):
+            self.ingest = IngestValidator(self.to_process_folder, self.quarantine_folder,
+                                          self.cache_folder / "ingest.json", INGEST)
+        
+        # Crop boxes, shared by the cropper and the multi-cropper
+        self.annotations = AnnotationStore(self.annotations_path, self.base_folder)
+        
+        # Image counts per stage, category and author
+        self.stats = StatsIndex(self.cache_folder / "stats.json", self.stage_folders(), self.annotations)
+        
         # Create notebook for tab navigation
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -105,18 +1522,29 @@ class ImageApp(tk.Tk):
         self.crop_frame = ttk.Frame(self.notebook)
         self.multi_crop_frame = ttk.Frame(self.notebook)
         self.rotator_frame = ttk.Frame(self.notebook)
+        self.statistics_frame = ttk.Frame(self.notebook)
         
         # Add tabs in order
         self.notebook.add(self.categorizer_frame, text="Categorize Images")
         self.notebook.add(self.crop_frame, text="Crop Image")
         self.notebook.add(self.multi_crop_frame, text="Multi-Crop Images")
         self.notebook.add(self.rotator_frame, text="Rotate Images")
+        self.notebook.add(self.statistics_frame, text="Statistics")
         
         # Initialize widgets
         self.categorizer = Categorizer(self.categorizer_frame, self)
         self.crop = Crop(self.crop_frame, self)
         self.multi_crop = MultiCropper(self.multi_crop_frame, self)
         self.rotator = Rotator(self.rotator_frame, self)
+        self.statistics = Statistics(self.statistics_frame, self)
+        
+        # Automatic stages run in the background as soon as multi-crops are saved
+        self.scheduler = None
+        if SCHEDULER.get('enabled', True):
+            self.scheduler = StageScheduler(self.rotated_folder, self.rotator.pipeline, self.rotator.output_settings,
+                                            on_written=self.rotator.count_outputs)
+            self.rotator.poll_scheduler()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Set up global key bindings for each tab
         self.bind('<Return>', self.handle_return_key)
@@ -125,6 +1553,31 @@ class ImageApp(tk.Tk):
         # Bind tab change event to update focus
         self.notebook.bind('<<NotebookTabChanged>>', self.tab_changed)
     
+    def stage_folders(self):
+        """Get the folder of each stage counted by the statistics"""
+        return {
+            'categorized': self.categorized_folder,
+            'cropped': self.cropped_folder,
+            'multi_cropped': self.multi_cropped_folder,
+            'rotated': self.rotated_folder,
+        }
+    
+    def publish(self, stage, path):
+        """Notify the next stage that an image has been written"""
+        if stage == 'cropped':
+            self.multi_crop.add_image(path)
+        elif stage == 'multi_cropped' and self.scheduler:
+            self.scheduler.submit(path)
+    
+    def on_close(self):
+        """Stop background workers and close the app"""
+        if self.scheduler:
+            self.scheduler.shutdown()
+        if self.ingest:
+            self.ingest.stop()
+        print(f"Image cache: {DECODED_IMAGES.stats()}")
+        self.destroy()
+    
     def tab_changed(self, event):
         """Handle tab change event to update focus"""
         current_tab = self.notebook.select()
@@ -136,6 +1589,8 @@ class ImageApp(tk.Tk):
             self.multi_crop.focus_set()
         elif current_tab == str(self.rotator_frame):
             self.rotator.focus_set()
+        elif current_tab == str(self.statistics_frame):
+            self.statistics.refresh()
     
     def handle_return_key(self, event):
         """Handle Return key press based on active tab"""
@@ -143,7 +1598,7 @@ class ImageApp(tk.Tk):
         if current_tab == str(self.categorizer_frame):
             self.categorizer.keep_image()
         elif current_tab == str(self.crop_frame):
-            self.crop.save_and_next()
+            self.crop.save_crop()
     
     def handle_delete_key(self, event):
         """Handle Delete key press based on active tab"""
@@ -188,6 +1643,20 @@ class Categorizer(tk.Frame):
                                       padx=20, pady=5)
         self.delete_button.pack(side=tk.LEFT, padx=5)
         
+        self.grid_button = tk.Button(self.button_frame, text="Grid mode (G)", command=self.toggle_grid_mode,
+                                     padx=20, pady=5)
+        self.grid_button.pack(side=tk.LEFT, padx=5)
+        
+        # Contact sheet (grid) mode, thumbnails are built by a thread pool
+        self.grid_mode = False
+        self.page_start = 0
+        self.page_paths = []
+        self.selected_tiles = set()
+        self.thumbnail_futures = {}
+        self.thumbnail_executor = ThreadPoolExecutor(max_workers=CONTACT_SHEET.get('workers', 4))
+        self.render_generation = 0
+        self.create_grid()
+        
         # Create right frame for radio buttons
         self.right_frame = tk.Frame(self.container)
         self.right_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(10, 0))
@@ -209,16 +1678,113 @@ class Categorizer(tk.Frame):
             )
             rb.pack(anchor=tk.W, pady=2)
         
-        # Store the image folder path and get all image files
-        self.image_files = [f for f in self.app.to_process_folder.glob("*") 
-                          if f.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp')]
+        # Category suggested by the nearest-neighbour index
+        self.suggestion_label = tk.Label(self.right_frame, text="", font=('Arial', 10, 'italic'), fg="gray")
+        self.suggestion_label.pack(anchor=tk.W, pady=(10, 0))
+        
+        # Progress of the startup check of new images
+        self.ingest_label = tk.Label(self.right_frame, text="", font=('Arial', 10), fg="gray")
+        self.ingest_label.pack(anchor=tk.W, pady=(10, 0))
+        
+        self.category_index = None
+        self.current_features = None
+        if CATEGORY_INDEX.get('enabled', True):
+            self.category_index = CategoryIndex(self.app.cache_folder / "category_index")
+            # Catch up on images categorized outside the app, without blocking the UI
+            threading.Thread(target=self.category_index.sync, args=(self.app.categorized_folder,),
+                             daemon=True).start()
+        
+        # Store the image folder path and get all image files, the ones still being checked are added later
+        ingest = self.app.ingest
+        self.image_files = [f for f in list_input_images(self.app.to_process_folder, self.app.cache_folder / "archives")
+                            if not (ingest and ingest.is_pending(f))]
         self.current_index = 0
         
+        # Images listed so far, results of images checked before the listing must not add them twice
+        self.listed_files = set(self.image_files)
+        
         # Bind number keys to categories
         self.setup_key_bindings()
         
-        # Load and display the first image
-        self.load_current_image()
+        # Load and display the first image (unless the first ones are still being checked)
+        if self.image_files or not ingest or ingest.progress()[0] == ingest.progress()[1]:
+            self.load_current_image()
+        if ingest:
+            self.poll_ingest()
+    
+    def poll_ingest(self):
+        """Add the images that passed the startup check and show its progress"""
+        ingest = self.app.ingest
+        finished = self.current_index >= len(self.image_files)
+        added = False
+        while True:
+            try:
+                path, passed = ingest.results.get_nowait()
+            except queue.Empty:
+                break
+            if passed and path not in self.listed_files:
+                self.image_files.append(path)
+                self.listed_files.add(path)
+                added = True
+        
+        checked, total, quarantined = ingest.progress()
+        if checked < total:
+            self.ingest_label.configure(text=f"Checking new images: {checked}/{total}")
+        elif quarantined:
+            self.ingest_label.configure(text=f"{quarantined} unusable images moved to quarantine")
+        else:
+            self.ingest_label.configure(text="")
+        
+        if added:
+            if self.grid_mode:
+                if len(self.page_paths) < self.page_size:
+                    self.render_page()
+            elif finished:
+                self.load_current_image()
+        
+        if ingest.thread.is_alive() or not ingest.results.empty():
+            self.after(200, self.poll_ingest)
+    
+    def create_grid(self):
+        """Create the contact sheet frame (shown in grid mode only)"""
+        columns = CONTACT_SHEET.get('columns', 5)
+        rows = CONTACT_SHEET.get('rows', 3)
+        self.page_size = columns * rows
+        
+        self.grid_frame = tk.Frame(self.left_frame)
+        
+        self.tiles_frame = tk.Frame(self.grid_frame)
+        self.tiles_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tile_frames = []
+        self.tile_labels = []
+        for row in range(rows):
+            for col in range(columns):
+                index = row * columns + col
+                frame = tk.Frame(self.tiles_frame, borderwidth=3, relief="groove", background="lightgray")
+                frame.grid(row=row, column=col, padx=3, pady=3, sticky="nsew")
+                
+                # Configure grid to make cells equal size
+                self.tiles_frame.grid_columnconfigure(col, weight=1)
+                self.tiles_frame.grid_rowconfigure(row, weight=1)
+                
+                label = tk.Label(frame)
+                label.pack(fill=tk.BOTH, expand=True)
+                label.bind("<Button-1>", lambda e, idx=index: self.toggle_tile(idx))
+                
+                self.tile_frames.append(frame)
+                self.tile_labels.append(label)
+        
+        # Page navigation
+        self.page_frame = tk.Frame(self.grid_frame)
+        self.page_frame.pack(fill=tk.X, pady=5)
+        
+        tk.Button(self.page_frame, text="Previous page", command=self.prev_page).pack(side=tk.LEFT, padx=5)
+        tk.Button(self.page_frame, text="Next page", command=self.next_page).pack(side=tk.LEFT, padx=5)
+        tk.Button(self.page_frame, text="Select all", command=self.select_all_tiles).pack(side=tk.LEFT, padx=5)
+        
+        self.page_label = tk.Label(self.page_frame, text="", font=('Arial', 10))
+        self.page_label.pack(side=tk.LEFT, padx=10)
     
     def _initialize_category_counters(self):
         """Initialize counters for all categories based on existing files"""
@@ -266,13 +1832,30 @@ class Categorizer(tk.Frame):
         # Bind Enter to Keep and Delete to delete
         self.app.bind('<Return>', lambda e: self.keep_image())
         self.app.bind('<Delete>', lambda e: self.delete_image())
+        
+        # Grid mode toggle and page navigation
+        self.app.bind('<g>', self.create_tab_handler(self.toggle_grid_mode))
+        self.app.bind('<G>', self.create_tab_handler(self.toggle_grid_mode))
+        self.app.bind('<Prior>', self.create_tab_handler(self.prev_page))
+        self.app.bind('<Next>', self.create_tab_handler(self.next_page))
+    
+    def create_tab_handler(self, action):
+        """Create a handler that only runs when the categorizer tab is active"""
+        def handler(event):
+            if self.app.notebook.select() == str(self.app.categorizer_frame):
+                action()
+        return handler
     
     def create_key_handler(self, index):
         """Create a handler for number key press"""
         def handler(event):
             if self.app.notebook.select() == str(self.app.categorizer_frame):
                 if index < len(CATEGORIES):
-                    self.selected_category.set(CATEGORIES[index][1])
+                    if self.grid_mode:
+                        # In grid mode, the digit categorizes all selected tiles at once
+                        self.categorize_selected(CATEGORIES[index][1])
+                    else:
+                        self.selected_category.set(CATEGORIES[index][1])
         return handler
         
     def load_current_image(self):
@@ -287,12 +1870,12 @@ class Categorizer(tk.Frame):
         # Get current image path
         image_path = self.image_files[self.current_index]
         
-        # Open and resize image to fit window
-        image = Image.open(image_path)
+        # Open and resize image to fit window (cached, going back is instant)
+        image = DECODED_IMAGES.get(image_path, ('preview', 800, 600), lambda path: load_preview(path, (800, 600)))
         
-        # Calculate new size while maintaining aspect ratio
-        max_size = (800, 600)
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        # Read the next archive members while the annotator looks at this one
+        read_ahead = ARCHIVES.get('read_ahead', 8)
+        prefetch_images(self.image_files[self.current_index + 1:self.current_index + 1 + read_ahead])
         
         # Convert to PhotoImage
         photo = ImageTk.PhotoImage(image)
@@ -306,8 +1889,30 @@ class Categorizer(tk.Frame):
         
         # Clear radio button selection
         self.selected_category.set("")
+        self.suggest_category(image)
+    
+    def suggest_category(self, image):
+        """Pre-select the category of the most similar categorized images"""
+        self.suggestion_label.configure(text="")
+        if not self.category_index:
+            return
+        
+        self.current_features = image_features(image)
+        category, confidence = self.category_index.query(self.current_features, CATEGORY_INDEX.get('neighbours', 15))
+        if category is None:
+            return
+        
+        display_name = next(name for name, prefix in CATEGORIES if prefix == category)
+        self.suggestion_label.configure(text=f"Suggestion : {display_name} ({confidence:.0%})")
+        if confidence >= CATEGORY_INDEX.get('min_confidence', 0.6):
+            self.selected_category.set(category)
         
     def keep_image(self):
+        if self.grid_mode:
+            if self.selected_category.get():
+                self.categorize_selected(self.selected_category.get())
+            return
+        
         if not self.selected_category.get():
             messagebox.showwarning("Warning", "Veuillez sélectionner une catégorie avant de continuer.")
             return
@@ -322,6 +1927,9 @@ class Categorizer(tk.Frame):
         try:
             # Move the file to the categorized folder
             current_image.rename(new_path)
+            self.app.stats.add('categorized', [new_path.stem])
+            if self.category_index and self.current_features is not None:
+                self.category_index.add(new_filename, category, self.current_features)
             # Remove the processed file from the list
             self.image_files.pop(self.current_index)
             # Move to next image
@@ -330,17 +1938,186 @@ class Categorizer(tk.Frame):
             messagebox.showerror("Error", f"Failed to move image: {str(e)}")
         
     def delete_image(self):
+        if self.grid_mode:
+            self.delete_selected()
+            return
+        
         if not self.image_files:
             return
             
         current_image = self.image_files[self.current_index]
         try:
-            os.remove(current_image)
+            current_image.unlink()
             self.image_files.pop(self.current_index)
             self.load_current_image()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete image: {str(e)}")
 
+    def toggle_grid_mode(self):
+        """Switch between single image and contact sheet modes"""
+        self.grid_mode = not self.grid_mode
+        if self.grid_mode:
+            self.image_label.pack_forget()
+            self.grid_frame.pack(before=self.button_frame, fill=tk.BOTH, expand=True)
+            self.grid_button.configure(text="Single mode (G)")
+            self.suggestion_label.configure(text="")
+            # The selection or suggestion was made for the single image, not the tiles
+            self.selected_category.set("")
+            # Start the grid on the page containing the current image
+            self.page_start = self.current_index - self.current_index % self.page_size
+            self.render_page()
+        else:
+            self.grid_frame.pack_forget()
+            self.image_label.pack(before=self.button_frame, pady=10)
+            self.grid_button.configure(text="Grid mode (G)")
+            self.current_index = min(self.page_start, max(0, len(self.image_files) - 1))
+            self.load_current_image()
+    
+    def _thumbnail(self, path):
+        """Get the future building the thumbnail of an image, submitting it if needed"""
+        if path not in self.thumbnail_futures:
+            size = CONTACT_SHEET.get('thumbnail_size', 180)
+            self.thumbnail_futures[path] = self.thumbnail_executor.submit(load_preview, path, (size, size))
+        return self.thumbnail_futures[path]
+    
+    def render_page(self):
+        """Display the current page of thumbnails and prefetch the next one"""
+        total = len(self.image_files)
+        if self.page_start >= total:
+            self.page_start = max(0, (total - 1) // self.page_size * self.page_size)
+        
+        self.page_paths = self.image_files[self.page_start:self.page_start + self.page_size]
+        self.selected_tiles &= set(self.page_paths)
+        
+        for i, label in enumerate(self.tile_labels):
+            label.configure(image="", text="")
+            label.image = None
+            self.tile_frames[i].configure(background="lightgray")
+            if i < len(self.page_paths):
+                self._thumbnail(self.page_paths[i])
+                label.configure(text="Loading...")
+        
+        if self.page_paths:
+            self.page_label.configure(text=f"Images {self.page_start + 1}-{self.page_start + len(self.page_paths)} of {total}")
+            self.app.title(f"Image Processing Tool - Grid: page {self.page_start // self.page_size + 1}")
+        else:
+            self.page_label.configure(text="No more images to process!")
+        
+        # Prefetch the next page and forget thumbnails far from the current one
+        next_page = self.image_files[self.page_start + self.page_size:self.page_start + 2 * self.page_size]
+        for path in next_page:
+            self._thumbnail(path)
+        keep = set(self.image_files[max(0, self.page_start - self.page_size):self.page_start + 2 * self.page_size])
+        for path in list(self.thumbnail_futures):
+            if path not in keep:
+                self.thumbnail_futures.pop(path).cancel()
+        
+        self.render_generation += 1
+        self.poll_tiles(self.render_generation, set(range(len(self.page_paths))))
+    
+    def poll_tiles(self, generation, pending):
+        """Show thumbnails as the thread pool finishes them"""
+        if generation != self.render_generation:
+            return
+        
+        for i in list(pending):
+            future = self._thumbnail(self.page_paths[i])
+            if not future.done():
+                continue
+            pending.discard(i)
+            try:
+                photo = ImageTk.PhotoImage(future.result())
+                self.tile_labels[i].configure(image=photo, text="")
+                self.tile_labels[i].image = photo
+            except Exception as e:
+                self.tile_labels[i].configure(text=f"Error: {str(e)}", wraplength=150)
+        
+        if pending:
+            self.after(30, self.poll_tiles, generation, pending)
+    
+    def toggle_tile(self, index):
+        """Toggle selection of a tile"""
+        if index < len(self.page_paths):
+            path = self.page_paths[index]
+            self.selected_tiles ^= {path}
+            color = "green" if path in self.selected_tiles else "lightgray"
+            self.tile_frames[index].configure(background=color)
+    
+    def select_all_tiles(self):
+        """Select every tile of the page"""
+        self.selected_tiles = set(self.page_paths)
+        for i in range(len(self.page_paths)):
+            self.tile_frames[i].configure(background="green")
+    
+    def prev_page(self):
+        """Go to the previous page of thumbnails"""
+        if self.grid_mode and self.page_start > 0:
+            self.page_start = max(0, self.page_start - self.page_size)
+            self.selected_tiles.clear()
+            self.render_page()
+    
+    def next_page(self):
+        """Go to the next page of thumbnails"""
+        if self.grid_mode and self.page_start + self.page_size < len(self.image_files):
+            self.page_start += self.page_size
+            self.selected_tiles.clear()
+            self.render_page()
+    
+    def categorize_selected(self, category):
+        """Move all selected tiles to the categorized folder in one go"""
+        selected = [path for path in self.page_paths if path in self.selected_tiles]
+        if not selected:
+            messagebox.showwarning("Warning", "Veuillez sélectionner au moins une image.")
+            return
+        
+        moved = set()
+        new_stems = []
+        errors = []
+        for path in selected:
+            new_filename = self._get_unique_filename(category, path.suffix)
+            try:
+                path.rename(self.app.categorized_folder / new_filename)
+            except Exception as e:
+                errors.append(f"{path.name}: {str(e)}")
+                continue
+            moved.add(path)
+            new_stems.append(Path(new_filename).stem)
+            
+            # Index the image with its thumbnail, already decoded
+            future = self.thumbnail_futures.get(path)
+            if self.category_index and future and future.done() and not future.exception():
+                self.category_index.add(new_filename, category, image_features(future.result()))
+        
+        self.app.stats.add('categorized', new_stems)
+        self.image_files = [f for f in self.image_files if f not in moved]
+        self.selected_tiles.clear()
+        if errors:
+            messagebox.showerror("Error", "Failed to move images:\n" + "\n".join(errors))
+        self.render_page()
+    
+    def delete_selected(self):
+        """Delete all selected tiles"""
+        selected = [path for path in self.page_paths if path in self.selected_tiles]
+        if not selected:
+            return
+        if not messagebox.askyesno("Delete", f"Delete {len(selected)} images?"):
+            return
+        
+        deleted = set()
+        errors = []
+        for path in selected:
+            try:
+                path.unlink()
+                deleted.add(path)
+            except Exception as e:
+                errors.append(f"{path.name}: {str(e)}")
+        
+        self.image_files = [f for f in self.image_files if f not in deleted]
+        self.selected_tiles.clear()
+        if errors:
+            messagebox.showerror("Error", "Failed to delete images:\n" + "\n".join(errors))
+        self.render_page()
+
 class Crop(tk.Frame):
     """Widget for single image cropping"""
     def __init__(self, parent, app):
@@ -349,15 +2126,39 @@ class Crop(tk.Frame):
         self.pack(fill=tk.BOTH, expand=True)
         
         # Initialize variables
-        self.image_files = [f for f in self.app.categorized_folder.glob("*") 
-                          if f.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp')]
+        self.all_files = sorted(f for f in self.app.categorized_folder.glob("*")
+                                if f.suffix.lower() in IMAGE_EXTENSIONS)
+        self.image_files = []
         self.current_index = 0
-        self.current_image = None
+        self.image_size = None
         self.photo_image = None
+        self.display_image = None
         self.selection_start = None
         self.selection_rect = None
+        self.selection_coords = None
         self.crop_counter = {}
         
+        # Latest drag position, drawn once Tk is idle (mice report motion faster than the screen refreshes)
+        self.pending_drag = None
+        self.drag_scheduled = False
+        
+        # Live preview of the selection: size in original pixels and magnified view
+        self.size_item = None
+        self.magnifier_item = None
+        self.magnifier_photo = None
+        
+        # Crop box proposals computed in the background
+        self.proposer = None
+        if CROP_PROPOSALS.get('enabled', True):
+            self.proposer = CropProposer(self.app.cache_folder / "crop_proposals.json")
+        self.proposals = []
+        self.proposal_index = 0
+        
+        # Persistent progress, so a restart resumes at the first unfinished image
+        self.progress = ProgressStore(self.app.cache_folder / "progress" / "crop.json", 'cropped',
+                                      self.app.cropped_folder)
+        self.only_pending = tk.BooleanVar(value=PROGRESS.get('only_pending', True))
+        
         # Create main container
         self.container = tk.Frame(self)
         self.container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -379,6 +2180,10 @@ class Crop(tk.Frame):
         self.progress_label = tk.Label(self.info_frame, text="", font=('Arial', 10))
         self.progress_label.pack(side=tk.LEFT, padx=5)
         
+        self.pending_check = tk.Checkbutton(self.info_frame, text="Show only pending", variable=self.only_pending,
+                                            command=self.toggle_pending)
+        self.pending_check.pack(side=tk.RIGHT, padx=5)
+        
         # Create button frame
         self.button_frame = tk.Frame(self.container, height=60, bg="lightgray")
         self.button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=10)
@@ -388,7 +2193,7 @@ class Crop(tk.Frame):
                                    padx=20, pady=8, bg="#e0e0e0", font=('Arial', 10, 'bold'))
         self.prev_button.pack(side=tk.LEFT, padx=20, pady=10)
         
-        self.skip_button = tk.Button(self.button_frame, text="Skip (N)", command=self.next_image,
+        self.skip_button = tk.Button(self.button_frame, text="Skip (N)", command=self.skip_image,
                                    padx=20, pady=8, bg="#FFA500", fg="white", font=('Arial', 10, 'bold'))
         self.skip_button.pack(side=tk.LEFT, padx=20, pady=10)
         
@@ -400,28 +2205,56 @@ class Crop(tk.Frame):
         self.canvas.bind("<ButtonPress-1>", self.on_press)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
-        self.bind("<n>", lambda e: self.next_image())
-        self.bind("<N>", lambda e: self.next_image())
+        self.bind("<n>", lambda e: self.skip_image())
+        self.bind("<N>", lambda e: self.skip_image())
+        self.bind("<p>", lambda e: self.next_proposal())
+        self.bind("<P>", lambda e: self.next_proposal())
+        
+        # Load first unfinished image
+        self.apply_filter()
+        if self.image_files:
+            self.load_current_image()
+    
+    def apply_filter(self):
+        """Show all images or only unfinished ones, staying on the current image if possible"""
+        current = self.image_files[self.current_index] if self.current_index < len(self.image_files) else None
+        if self.only_pending.get():
+            self.image_files = [f for f in self.all_files if not self.progress.is_done(f.stem)]
+        else:
+            self.image_files = list(self.all_files)
         
-        # Load first image
+        if current in self.image_files:
+            self.current_index = self.image_files.index(current)
+        else:
+            self.current_index = self.progress.first_pending(self.image_files)
+    
+    def toggle_pending(self):
+        """Switch between all images and unfinished images only"""
+        self.apply_filter()
         if self.image_files:
             self.load_current_image()
+        else:
+            self.canvas.delete("all")
+            self.selection_rect = None
+            self.selection_start = None
+            self.progress_label.configure(text="No pending images")
     
     def _get_crop_count(self, base_name):
         """Get the next available number for a specific base name"""
         if base_name in self.crop_counter:
             return self.crop_counter[base_name]
         
-        # Check existing files with this base name
-        existing_files = list(self.app.cropped_folder.glob(f"{base_name}_crop_*.*"))
-        if not existing_files:
+        # Check existing files and recorded boxes with this base name
+        existing_stems = [f.stem for f in self.app.cropped_folder.glob(f"{base_name}_crop_*.*")]
+        existing_stems += self.app.annotations.ids(f"{base_name}_crop_")
+        if not existing_stems:
             return 1
         
         # Extract numbers from existing files
         numbers = []
-        for file in existing_files:
+        for stem in existing_stems:
             try:
-                number_part = file.stem.split('_crop_')[1]
+                number_part = stem.split('_crop_')[1]
                 if number_part.isdigit():
                     numbers.append(int(number_part))
             except (IndexError, ValueError):
@@ -435,11 +2268,23 @@ class Crop(tk.Frame):
         return max(numbers) + 1
     
     def load_current_image(self):
-        """Load and display the current image"""
+        """Load and display the current image, skipping the images that cannot be read"""
+        failed = []
+        while self.image_files and self.current_index < len(self.image_files):
+            try:
+                self._show_current_image()
+                break
+            except Exception as e:
+                failed.append(f"{self.image_files[self.current_index].name}: {str(e)}")
+                self.current_index += 1
+        
+        if failed:
+            messagebox.showerror("Error", "Failed to load images:\n" + "\n".join(failed[:10]))
         if not self.image_files or self.current_index >= len(self.image_files):
             messagebox.showinfo("Complete", "No more images to process!")
-            return
-        
+    
+    def _show_current_image(self):
+        """Display the current image, raises if it cannot be read"""
         # Get current image path
         self.current_image_path = self.image_files[self.current_index]
         
@@ -450,76 +2295,117 @@ class Crop(tk.Frame):
         if self.current_base_name not in self.crop_counter:
             self.crop_counter[self.current_base_name] = self._get_crop_count(self.current_base_name)
         
-        try:
-            # Open and resize image to fit canvas
-            self.current_image = Image.open(self.current_image_path)
-            
-            # Calculate resize dimensions to fit canvas while maintaining aspect ratio
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            
-            if canvas_width <= 1:  # Canvas not yet drawn
-                canvas_width = 800
-                canvas_height = 600
-            
+        # Calculate resize dimensions to fit canvas while maintaining aspect ratio
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        
+        if canvas_width <= 1:  # Canvas not yet drawn
+            canvas_width = 800
+            canvas_height = 600
+        
+        # Open image, only the display size is decoded (the crop is decoded on save)
+        display_img, self.image_size = DECODED_IMAGES.get(
+            self.current_image_path, ('display', canvas_width, canvas_height),
+            lambda path: self._load_display_image(path, canvas_width, canvas_height))
+        scale = min(canvas_width/self.image_size[0], canvas_height/self.image_size[1])
+        self.display_image = display_img
+        
+        # Convert to PhotoImage
+        self.photo_image = ImageTk.PhotoImage(display_img)
+        
+        # Update canvas, the selection overlay items are created once per image and moved afterwards
+        self.canvas.delete("all")
+        self.canvas.create_image(canvas_width//2, canvas_height//2, 
+                               image=self.photo_image, anchor=tk.CENTER)
+        self.selection_rect = self.canvas.create_rectangle(0, 0, 0, 0, outline='red', width=2, state=tk.HIDDEN)
+        self.size_item = self.canvas.create_text(0, 0, anchor=tk.SW, fill='red', font=('Arial', 10, 'bold'),
+                                                 state=tk.HIDDEN)
+        self.magnifier_item = self.canvas.create_image(canvas_width - 10, 10, anchor=tk.NE, state=tk.HIDDEN)
+        
+        # Store scale factor for later use in cropping
+        self.scale_factor = scale
+        
+        # Update information
+        self.file_label.configure(text=f"File: {self.current_image_path.name}")
+        status = self.progress.status(self.current_base_name)
+        self.progress_label.configure(text=f"Image {self.current_index + 1} of {len(self.image_files)}"
+                                      + (f" (already {status})" if status else ""))
+        
+        # Update application title
+        self.app.title(f"Image Processing Tool - Cropping: {self.current_image_path.name}")
+        
+        # Clear any existing selection
+        self.pending_drag = None
+        self.selection_start = None
+        self.selection_coords = None
+        
+        # Pre-draw the best proposal, computing the next ones in the background
+        self.proposals = []
+        self.proposal_index = 0
+        if self.proposer:
+            lookahead = CROP_PROPOSALS.get('lookahead', 5)
+            self.proposer.request(self.image_files[self.current_index:self.current_index + lookahead + 1])
+            self.poll_proposals(self.current_image_path)
+    
+    def _load_display_image(self, path, canvas_width, canvas_height):
+        """Decode an image at the size it is displayed, returns it with the original size"""
+        with open_image(path) as img:
             # Calculate resize dimensions
-            img_width, img_height = self.current_image.size
+            img_width, img_height = img.size
             scale = min(canvas_width/img_width, canvas_height/img_height)
             new_width = int(img_width * scale)
             new_height = int(img_height * scale)
             
             # Resize image
-            display_img = self.current_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Convert to PhotoImage
-            self.photo_image = ImageTk.PhotoImage(display_img)
-            
-            # Update canvas
-            self.canvas.delete("all")
-            self.canvas.create_image(canvas_width//2, canvas_height//2, 
-                                   image=self.photo_image, anchor=tk.CENTER)
-            
-            # Store scale factor for later use in cropping
-            self.scale_factor = scale
-            
-            # Update information
-            self.file_label.configure(text=f"File: {self.current_image_path.name}")
-            self.progress_label.configure(text=f"Image {self.current_index + 1} of {len(self.image_files)}")
-            
-            # Update application title
-            self.app.title(f"Image Processing Tool - Cropping: {self.current_image_path.name}")
-            
-            # Clear any existing selection
-            if self.selection_rect:
-                self.canvas.delete(self.selection_rect)
-                self.selection_rect = None
-            self.selection_start = None
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load image: {str(e)}")
-            self.next_image()
+            img.draft('RGB', (new_width, new_height))
+            display_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        return display_img, (img_width, img_height)
     
-    def on_press(self, event):
-        """Handle mouse press event"""
-        # Clear previous selection
-        if self.selection_rect:
-            self.canvas.delete(self.selection_rect)
-        
-        # Store starting point
-        self.selection_start = (event.x, event.y)
+    def _image_origin(self):
+        """Get the canvas position of the displayed image's top-left corner"""
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        img_x = (canvas_width - self.photo_image.width()) // 2
+        img_y = (canvas_height - self.photo_image.height()) // 2
+        return img_x, img_y
     
-    def on_drag(self, event):
-        """Handle mouse drag event"""
-        if not self.selection_start:
+    def poll_proposals(self, image_path):
+        """Show proposals for the image once the background worker has computed them"""
+        # The user moved on or already drew a selection
+        if image_path != self.current_image_path or self.selection_start or self.selection_coords:
             return
         
-        # Delete previous rectangle
-        if self.selection_rect:
-            self.canvas.delete(self.selection_rect)
+        proposals = self.proposer.get(image_path)
+        if proposals is None:
+            self.after(100, self.poll_proposals, image_path)
+            return
+        
+        self.proposals = proposals
+        self.proposal_index = 0
+        if self.proposals:
+            self.show_proposal()
+    
+    def show_proposal(self):
+        """Draw the current proposal as the selection"""
+        x1, y1, x2, y2, _ = self.proposals[self.proposal_index]
+        
+        # Convert image coordinates to canvas coordinates
+        img_x, img_y = self._image_origin()
+        coords = (img_x + x1 * self.scale_factor, img_y + y1 * self.scale_factor,
+                  img_x + x2 * self.scale_factor, img_y + y2 * self.scale_factor)
         
-        # Calculate square dimensions
+        self._draw_selection(coords, dash=(6, 3))
+        self.selection_coords = coords
+    
+    def next_proposal(self):
+        """Cycle through the proposals of the current image"""
+        if self.proposals:
+            self.proposal_index = (self.proposal_index + 1) % len(self.proposals)
+            self.show_proposal()
+    
+    def _square(self, x2, y2):
+        """Get the square selection from the drag start to a point, in canvas coordinates"""
         x1, y1 = self.selection_start
-        x2, y2 = event.x, event.y
         
         # Make it a square by using the smaller dimension
         size = min(abs(x2 - x1), abs(y2 - y1))
@@ -535,44 +2421,96 @@ class Crop(tk.Frame):
         else:
             y2 = y1 + size
         
-        # Draw new rectangle
-        self.selection_rect = self.canvas.create_rectangle(
-            x1, y1, x2, y2,
-            outline='red', width=2
-        )
+        return (x1, y1, x2, y2)
     
-    def on_release(self, event):
-        """Handle mouse release event"""
-        if not self.selection_start:
+    def _draw_selection(self, coords, dash=()):
+        """Move the selection rectangle and its live preview to the given canvas coordinates"""
+        self.canvas.coords(self.selection_rect, *coords)
+        self.canvas.itemconfigure(self.selection_rect, state=tk.NORMAL, dash=dash)
+        
+        if CROP_PREVIEW.get('enabled', True):
+            self._draw_preview(coords)
+    
+    def _hide_selection(self):
+        """Hide the selection rectangle and its live preview"""
+        for item in (self.selection_rect, self.size_item, self.magnifier_item):
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+    
+    def _draw_preview(self, coords):
+        """Show the size of the selection in original pixels and a magnified view of it
+        
+        The view is cut from the display image, the original is only decoded on save.
+        """
+        x1, y1, x2, y2 = coords
+        img_x, img_y = self._image_origin()
+        left = max(0, min(x1, x2) - img_x)
+        top = max(0, min(y1, y2) - img_y)
+        right = min(self.display_image.width, max(x1, x2) - img_x)
+        bottom = min(self.display_image.height, max(y1, y2) - img_y)
+        if right - left < 1 or bottom - top < 1:
+            self.canvas.itemconfigure(self.size_item, state=tk.HIDDEN)
+            self.canvas.itemconfigure(self.magnifier_item, state=tk.HIDDEN)
             return
         
-        # Finalize the selection
-        x1, y1 = self.selection_start
-        x2, y2 = event.x, event.y
+        # Size of the crop in the original picture
+        side = round(max(right - left, bottom - top) / self.scale_factor)
+        self.canvas.coords(self.size_item, min(x1, x2), min(y1, y2) - 4)
+        self.canvas.itemconfigure(self.size_item, text=f"{side} x {side} px", state=tk.NORMAL)
+        
+        # Magnified view of the selection
+        magnifier_size = CROP_PREVIEW.get('magnifier_size', 160)
+        view = self.display_image.crop((left, top, right, bottom))
+        view = view.resize((magnifier_size, round(magnifier_size * view.height / view.width)),
+                           Image.Resampling.BILINEAR)
+        self.magnifier_photo = ImageTk.PhotoImage(view)
+        self.canvas.itemconfigure(self.magnifier_item, image=self.magnifier_photo, state=tk.NORMAL)
+        self.canvas.tag_raise(self.magnifier_item)
+    
+    def on_press(self, event):
+        """Handle mouse press event"""
+        # No image displayed
+        if self.selection_rect is None:
+            return
         
-        # Make it a square
-        size = min(abs(x2 - x1), abs(y2 - y1))
+        # Clear previous selection
+        self._hide_selection()
         
-        if x2 < x1:
-            x2 = x1 - size
-        else:
-            x2 = x1 + size
-            
-        if y2 < y1:
-            y2 = y1 - size
-        else:
-            y2 = y1 + size
+        # Store starting point
+        self.selection_start = (event.x, event.y)
+        self.selection_coords = None
+    
+    def on_drag(self, event):
+        """Handle mouse drag event, the selection is redrawn once per idle cycle at most"""
+        if not self.selection_start:
+            return
+        
+        self.pending_drag = (event.x, event.y)
+        if not self.drag_scheduled:
+            self.drag_scheduled = True
+            self.after_idle(self._render_drag)
+    
+    def _render_drag(self):
+        """Draw the selection at the latest drag position"""
+        self.drag_scheduled = False
+        if not self.pending_drag or not self.selection_start:
+            return
         
-        # Update the rectangle
-        if self.selection_rect:
-            self.canvas.coords(self.selection_rect, x1, y1, x2, y2)
+        self._draw_selection(self._square(*self.pending_drag))
+        self.pending_drag = None
+    
+    def on_release(self, event):
+        """Handle mouse release event"""
+        if not self.selection_start:
+            return
         
-        # Store the final selection coordinates
-        self.selection_coords = (x1, y1, x2, y2)
+        # Finalize the selection, dropping any drag position not drawn yet
+        self.pending_drag = None
+        self.selection_coords = self._square(event.x, event.y)
+        self._draw_selection(self.selection_coords)
     
     def save_crop(self):
         """Save the current selection as a crop"""
-        if not hasattr(self, 'selection_coords'):
+        if not self.selection_coords:
             messagebox.showwarning("Warning", "Please select an area to crop first!")
             return
         
@@ -580,15 +2518,8 @@ class Crop(tk.Frame):
             # Get selection coordinates
             x1, y1, x2, y2 = self.selection_coords
             
-            # Convert canvas coordinates to image coordinates
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            
             # Calculate image position on canvas
-            img_width = self.photo_image.width()
-            img_height = self.photo_image.height()
-            img_x = (canvas_width - img_width) // 2
-            img_y = (canvas_height - img_height) // 2
+            img_x, img_y = self._image_origin()
             
             # Convert selection coordinates to image coordinates
             x1 = (x1 - img_x) / self.scale_factor
@@ -596,32 +2527,55 @@ class Crop(tk.Frame):
             x2 = (x2 - img_x) / self.scale_factor
             y2 = (y2 - img_y) / self.scale_factor
             
-            # Ensure coordinates are within image bounds
-            x1 = max(0, min(x1, self.current_image.width))
-            y1 = max(0, min(y1, self.current_image.height))
-            x2 = max(0, min(x2, self.current_image.width))
-            y2 = max(0, min(y2, self.current_image.height))
-            
-            # Crop the image
-            crop = self.current_image.crop((x1, y1, x2, y2))
+            # Ensure coordinates are within image bounds (the square may be drawn in any direction)
+            img_width, img_height = self.image_size
+            x1, x2 = sorted((max(0, min(x1, img_width)), max(0, min(x2, img_width))))
+            y1, y2 = sorted((max(0, min(y1, img_height)), max(0, min(y2, img_height))))
             
             # Create filename
-            extension = self.current_image_path.suffix
-            crop_filename = f"{self.current_base_name}_crop_{self.crop_counter[self.current_base_name]}{extension}"
-            crop_path = self.app.cropped_folder / crop_filename
+            settings = output_settings('cropped')
+            extension = output_extension(self.current_image_path, settings)
+            crop_stem = f"{self.current_base_name}_crop_{self.crop_counter[self.current_base_name]}"
             
-            # Save crop
-            crop.save(crop_path)
+            # Save crop, or only its box (the multi-cropper then decodes it from the source)
+            crop_path = None
+            if ANNOTATIONS.get('save_crop_files', True):
+                # Crop the image, decoded at a reduced scale when the output is smaller
+                crop = decode_region(self.current_image_path, (x1, y1, x2, y2), settings)
+                crop_path = save_intermediate(crop, self.app.cropped_folder, crop_stem, extension, settings)
+            
+            # Record the box in original pixels
+            record = {
+                'id': crop_stem,
+                'source': self.current_image_path.relative_to(self.app.base_folder).as_posix(),
+                'category': parse_category(self.current_base_name),
+                'box': [round(x1), round(y1), round(x2), round(y2)],
+                'size': list(self.image_size),
+                'author': AUTHOR,
+                'crop': crop_path.relative_to(self.app.base_folder).as_posix() if crop_path else None,
+            }
+            self.app.annotations.add(record)
+            self.app.stats.add('cropped', [crop_stem])
+            self.app.publish('cropped', crop_path or AnnotatedCrop(record, self.app.base_folder))
             
             # Increment counter
             self.crop_counter[self.current_base_name] += 1
             
+            # Remember the image is done
+            self.progress.set(self.current_base_name, 'cropped', self.progress.outputs(self.current_base_name) + 1)
+            
             # Move to next image
             self.next_image()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save crop: {str(e)}")
     
+    def skip_image(self):
+        """Mark the current image as skipped and move to the next one"""
+        if self.image_files and not self.progress.is_done(self.current_base_name):
+            self.progress.set(self.current_base_name, 'skipped')
+        self.next_image()
+    
     def next_image(self):
         """Move to next image"""
         if self.current_index < len(self.image_files) - 1:
@@ -645,16 +2599,23 @@ class MultiCropper(tk.Frame):
         
         # Initialize crop counter
         self.crop_counter = {}
+        self.original = None
         
-        # Get all images in cropped folder (from single crop widget)
-        self.image_files = [f for f in self.app.cropped_folder.glob("*") 
-                           if f.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp')]
+        # Get all images in cropped folder (from single crop widget), and the crops only recorded as boxes
+        self.all_files = list_crops(self.app.cropped_folder, self.app.annotations)
+        self.image_files = []
         self.current_index = 0
         
+        # Persistent progress, so a restart resumes at the first unfinished image
+        self.progress = ProgressStore(self.app.cache_folder / "progress" / "multi_crop.json", 'multi_cropped',
+                                      self.app.multi_cropped_folder)
+        self.only_pending = tk.BooleanVar(value=PROGRESS.get('only_pending', True))
+        
         # Create UI
         self.create_widgets()
         
-        # Load first image
+        # Load first unfinished image
+        self.apply_filter()
         if self.image_files:
             self.load_current_image()
         
@@ -683,6 +2644,10 @@ class MultiCropper(tk.Frame):
         self.progress_label = tk.Label(self.info_frame, text="", font=('Arial', 10))
         self.progress_label.pack(anchor=tk.W, pady=2)
         
+        self.pending_check = tk.Checkbutton(self.info_frame, text="Show only pending", variable=self.only_pending,
+                                            command=self.toggle_pending)
+        self.pending_check.pack(anchor=tk.W, pady=2)
+        
         # Middle section - Crops grid
         self.crops_frame = tk.Frame(self.container)
         self.crops_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=10)
@@ -733,6 +2698,27 @@ class MultiCropper(tk.Frame):
         # Custom binding for this widget
         self.bind("<Return>", lambda e: self.save_and_next())
     
+    def apply_filter(self):
+        """Show all images or only unfinished ones, staying on the current image if possible"""
+        current = self.image_files[self.current_index] if self.current_index < len(self.image_files) else None
+        if self.only_pending.get():
+            self.image_files = [f for f in self.all_files if not self.progress.is_done(f.stem)]
+        else:
+            self.image_files = list(self.all_files)
+        
+        if current in self.image_files:
+            self.current_index = self.image_files.index(current)
+        else:
+            self.current_index = self.progress.first_pending(self.image_files)
+    
+    def toggle_pending(self):
+        """Switch between all images and unfinished images only"""
+        self.apply_filter()
+        if self.image_files:
+            self.load_current_image()
+        else:
+            self.progress_label.configure(text="No pending images")
+    
     def _get_crop_count(self, base_name):
         """Get the next available number for a specific base name"""
         if base_name in self.crop_counter:
@@ -761,11 +2747,23 @@ class MultiCropper(tk.Frame):
         return max(numbers) + 1
     
     def load_current_image(self):
-        """Load the current image and generate crops"""
+        """Load the current image and generate crops, skipping the images that cannot be read"""
+        failed = []
+        while self.image_files and self.current_index < len(self.image_files):
+            try:
+                self._show_current_image()
+                break
+            except Exception as e:
+                failed.append(f"{self.image_files[self.current_index].name}: {str(e)}")
+                self.current_index += 1
+        
+        if failed:
+            messagebox.showerror("Error", "Failed to process images:\n" + "\n".join(failed[:10]))
         if not self.image_files or self.current_index >= len(self.image_files):
             messagebox.showinfo("Complete", "No more images to crop!")
-            return
-        
+    
+    def _show_current_image(self):
+        """Display the current image and its crops, raises if it cannot be read"""
         # Get current image path
         self.current_image_path = self.image_files[self.current_index]
         
@@ -780,64 +2778,65 @@ class MultiCropper(tk.Frame):
         self.crop_selected = [False] * 9
         
         # Open image
-        try:
-            original = Image.open(self.current_image_path)
+        # Keep it decoded for regenerate_crops (shared with the cache, never modified)
+        original = DECODED_IMAGES.get(self.current_image_path, 'full', load_decoded)
+        self.original = original
+        
+        # Display original image (resized)
+        max_size = (300, 300)
+        display_img = original.copy()
+        display_img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        photo = ImageTk.PhotoImage(display_img)
+        self.original_label.configure(image=photo)
+        self.original_label.image = photo
+        
+        # Update information
+        self.file_label.configure(text=f"File: {self.current_image_path.name}")
+        status = self.progress.status(self.current_base_name)
+        self.progress_label.configure(text=f"Image {self.current_index + 1} of {len(self.image_files)}"
+                                      + (f" (already {status})" if status else ""))
+        
+        # Calculate original dimensions for crop positions
+        width, height = original.size
+        
+        # Generate nine crops
+        self.crops = []
+        crop_positions = self._generate_crop_positions(width, height)
+        
+        for i, (x, y, w, h) in enumerate(crop_positions):
+            # Create crop
+            crop = original.crop((x, y, x + w, y + h))
+            self.crops.append(crop)
             
-            # Display original image (resized)
-            max_size = (300, 300)
-            display_img = original.copy()
-            display_img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(display_img)
-            self.original_label.configure(image=photo)
-            self.original_label.image = photo
+            # Create thumbnail for display
+            max_crop_size = (200, 200)
+            crop_display = crop.copy()
+            crop_display.thumbnail(max_crop_size, Image.Resampling.LANCZOS)
             
-            # Update information
-            self.file_label.configure(text=f"File: {self.current_image_path.name}")
-            self.progress_label.configure(text=f"Image {self.current_index + 1} of {len(self.image_files)}")
-            
-            # Calculate original dimensions for crop positions
-            width, height = original.size
-            
-            # Generate nine crops
-            self.crops = []
-            crop_positions = self._generate_crop_positions(width, height)
-            
-            for i, (x, y, w, h) in enumerate(crop_positions):
-                # Create crop
-                crop = original.crop((x, y, x + w, y + h))
-                self.crops.append(crop)
-                
-                # Create thumbnail for display
-                max_crop_size = (200, 200)
-                crop_display = crop.copy()
-                crop_display.thumbnail(max_crop_size, Image.Resampling.LANCZOS)
-                
-                # Convert to PhotoImage
-                photo = ImageTk.PhotoImage(crop_display)
-                
-                # Update label
-                self.crop_labels[i].configure(image=photo)
-                self.crop_labels[i].image = photo
-                
-                # Reset frame border
-                self.crop_frames[i].configure(background="lightgray")
+            # Convert to PhotoImage
+            photo = ImageTk.PhotoImage(crop_display)
             
-            # Update application title
-            self.app.title(f"Image Processing Tool - Cropping: {self.current_image_path.name}")
+            # Update label
+            self.crop_labels[i].configure(image=photo)
+            self.crop_labels[i].image = photo
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to process image: {str(e)}")
-            self.current_index += 1
-            self.load_current_image()
+            # Reset frame border
+            self.crop_frames[i].configure(background="lightgray")
+        
+        # Update application title
+        self.app.title(f"Image Processing Tool - Cropping: {self.current_image_path.name}")
     
     def _generate_crop_positions(self, width, height):
         """Generate 9 random square crop positions within the image"""
+        if MULTI_CROP.get('sampler', 'diverse') == 'diverse':
+            return sample_crop_positions(width, height, 9)
+        
         # Use the smaller dimension to determine max crop size
         min_dimension = min(width, height)
         
-        # Less aggressive crop size (40-60% of the smaller dimension)
-        min_crop_size = int(min_dimension * 0.4)
-        max_crop_size = int(min_dimension * 0.6)
+        # Less aggressive crop size (40-60% of the smaller dimension by default)
+        min_crop_size = int(min_dimension * MULTI_CROP.get('min_size', 0.4))
+        max_crop_size = int(min_dimension * MULTI_CROP.get('max_size', 0.6))
         
         crop_positions = []
         
@@ -873,25 +2872,34 @@ class MultiCropper(tk.Frame):
             return
         
         # Save selected crops
+        settings = output_settings('multi_cropped')
+        saved_stems = []
         for i, selected in enumerate(self.crop_selected):
             if selected and i < len(self.crops):
                 try:
                     # Get file extension from original
-                    extension = self.current_image_path.suffix
+                    extension = output_extension(self.current_image_path, settings)
                     
                     # Create filename with original name and crop index
-                    crop_filename = f"{self.current_base_name}_crop_{self.crop_counter[self.current_base_name]}{extension}"
-                    crop_path = self.app.multi_cropped_folder / crop_filename
+                    crop_stem = f"{self.current_base_name}_crop_{self.crop_counter[self.current_base_name]}"
                     
                     # Save crop
-                    self.crops[i].save(crop_path)
+                    crop_path = save_intermediate(self.crops[i], self.app.multi_cropped_folder, crop_stem, extension, settings)
+                    self.app.publish('multi_cropped', crop_path)
                     
                     # Increment counter for next crop
                     self.crop_counter[self.current_base_name] += 1
+                    saved_stems.append(crop_stem)
                     
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save crop: {str(e)}")
         
+        self.app.stats.add('multi_cropped', saved_stems)
+        
+        # Remember the image is done (skipped when no crop was selected)
+        outputs = self.progress.outputs(self.current_base_name) + len(saved_stems)
+        self.progress.set(self.current_base_name, 'multi_cropped' if outputs else 'skipped', outputs)
+        
         # Move to next image
         self.current_index += 1
         
@@ -900,6 +2908,19 @@ class MultiCropper(tk.Frame):
         else:
             messagebox.showinfo("Complete", "All images have been processed!")
     
+    def add_image(self, path):
+        """Add an image cropped in the Crop tab, without restarting the app"""
+        if any(f.stem == path.stem for f in self.all_files):
+            return
+        
+        finished = self.current_index >= len(self.image_files)
+        self.all_files.append(path)
+        self.image_files.append(path)
+        if finished:
+            self.load_current_image()
+        else:
+            self.progress_label.configure(text=f"Image {self.current_index + 1} of {len(self.image_files)}")
+    
     def regenerate_crops(self):
         """Regenerate crops for the current image"""
         if not self.image_files or self.current_index >= len(self.image_files):
@@ -909,9 +2930,8 @@ class MultiCropper(tk.Frame):
         self.crop_selected = [False] * 9
         
         try:
-            # Get current image
-            image_path = self.image_files[self.current_index]
-            original = Image.open(image_path)
+            # Get current image, decoded when it was loaded
+            original = self.original
             
             # Calculate original dimensions for crop positions
             width, height = original.size
@@ -958,7 +2978,7 @@ class Rotator(tk.Frame):
         self.container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Create info label
-        self.info_label = tk.Label(self.container, text="Click the button below to generate rotated versions of all images in the multi-cropped folder.", 
+        self.info_label = tk.Label(self.container, text="Multi-crops are rotated in the background as soon as they are saved. Click the button below to generate rotated versions of the images in the multi-cropped folder that don't have them yet.", 
                                  font=('Arial', 12), wraplength=600)
         self.info_label.pack(pady=20)
         
@@ -966,6 +2986,10 @@ class Rotator(tk.Frame):
         self.status_label = tk.Label(self.container, text="", font=('Arial', 10))
         self.status_label.pack(pady=10)
         
+        # Background processing of new multi-crops
+        self.stream_label = tk.Label(self.container, text="", font=('Arial', 10), fg="gray")
+        self.stream_label.pack(pady=5)
+        
         # Create button
         self.rotate_button = tk.Button(self.container, text="Generate Rotated Images", 
                                      command=self.generate_rotated_images,
@@ -973,64 +2997,174 @@ class Rotator(tk.Frame):
                                      font=('Arial', 12, 'bold'))
         self.rotate_button.pack(pady=20)
         
-        # Define rotation intervals
-        self.rotation_intervals = [
-            (-35, -20),
-            (-20, -5),
-            (5, 20),
-            (20, 35)
-        ]
+        # Augmentation pipeline and output settings from config.yaml
+        self.pipeline = AUGMENTATIONS
+        self.output_settings = output_settings('rotated')
+        self.rotation_intervals = [tuple(interval) for op in self.pipeline['ops'] if op['op'] == 'rotate'
+                                   for interval in op.get('intervals', [])]
+        
+        # Sources whose outputs were counted, a source augmented twice must only count once
+        self.counted = set()
+        self.counted_lock = threading.Lock()
+    
+    def poll_scheduler(self):
+        """Show the progress of the background stage scheduler"""
+        queued, in_flight, done, errors = self.app.scheduler.status()
+        text = f"Background processing : {done} done, {in_flight} in progress, {queued} queued"
+        if errors:
+            text += f", {errors} errors (see console)"
+        self.stream_label.configure(text=text)
+        self.after(500, self.poll_scheduler)
+    
+    def count_outputs(self, written):
+        """Count the rotated images written, given as {source path: images written}"""
+        by_amount = {}
+        with self.counted_lock:
+            for path, amount in written.items():
+                if path.stem in self.counted:
+                    continue
+                self.counted.add(path.stem)
+                by_amount.setdefault(amount, []).append(path.stem)
+        for amount, stems in by_amount.items():
+            self.app.stats.add('rotated', stems, amount)
     
     def generate_rotated_images(self):
-        """Generate rotated versions of all images in the multi-cropped folder"""
-        # Get all images in multi-cropped folder
-        image_files = [f for f in self.app.multi_cropped_folder.glob("*") 
-                      if f.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp')]
+        """Generate augmented (rotated, ...) versions of the images of the multi-cropped folder that have none yet"""
+        # Get all images in multi-cropped folder, skipping the ones already processed or left to the background scheduler
+        scheduler = self.app.scheduler
+        image_files = [f for f in list_images(self.app.multi_cropped_folder)
+                       if not augmentation_done(f, self.app.rotated_folder, self.pipeline, self.output_settings)
+                       and not (scheduler and scheduler.is_pending(f))]
         
         if not image_files:
-            messagebox.showinfo("Info", "No images found in the multi-cropped folder!")
+            messagebox.showinfo("Info", "No new images found in the multi-cropped folder!")
             return
         
         total_images = len(image_files)
         processed = 0
+        errors = []
+        
+        self.rotate_button.configure(state=tk.DISABLED)
+        self.status_label.configure(text=f"Processing {total_images} images...")
+        self.update()
         
         try:
-            for image_path in image_files:
-                # Update status
-                self.status_label.configure(text=f"Processing {image_path.name}...")
-                self.update()
-                
-                # Open image
-                with Image.open(image_path) as img:
-                    # Generate 4 rotated versions
-                    for i, (min_angle, max_angle) in enumerate(self.rotation_intervals):
-                        # Generate random angle within interval
-                        angle = random.uniform(min_angle, max_angle)
-                        
-                        # Rotate image
-                        rotated = img.rotate(angle, expand=True, resample=Image.Resampling.BICUBIC)
-                        
-                        # Create filename for rotated image
-                        base_name = image_path.stem
-                        extension = image_path.suffix
-                        rotated_filename = f"{base_name}_rot_{i+1}{extension}"
-                        rotated_path = self.app.rotated_folder / rotated_filename
-                        
-                        # Save rotated image
-                        rotated.save(rotated_path)
+            # Each worker decodes a source once and writes all its outputs
+            with ProcessPoolExecutor(max_workers=self.pipeline['workers']) as executor:
+                futures = {executor.submit(augment_file, image_path, self.app.rotated_folder, self.pipeline,
+                                           self.output_settings): image_path
+                           for image_path in image_files}
                 
-                processed += 1
-                self.status_label.configure(text=f"Processed {processed}/{total_images} images")
-                self.update()
+                for future in as_completed(futures):
+                    try:
+                        self.count_outputs({futures[future]: future.result()})
+                    except Exception as e:
+                        errors.append(f"{futures[future].name}: {str(e)}")
+                    
+                    processed += 1
+                    self.status_label.configure(text=f"Processed {processed}/{total_images} images")
+                    self.update()
             
-            messagebox.showinfo("Complete", f"Successfully generated rotated versions of {total_images} images!")
-            self.status_label.configure(text="")
+            if errors:
+                messagebox.showerror("Error", f"Failed to augment {len(errors)} images:\n" + "\n".join(errors[:10]))
+            else:
+                messagebox.showinfo("Complete", f"Successfully generated rotated versions of {total_images} images!")
             
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
-            self.status_label.configure(text="")
+        
+        self.status_label.configure(text="")
+        self.rotate_button.configure(state=tk.NORMAL)
+
+class Statistics(tk.Frame):
+    """Widget showing the image counts per stage, category and author"""
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.pack(fill=tk.BOTH, expand=True)
+
+        # Create main container
+        self.container = tk.Frame(self)
+        self.container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Counts table, one row per category and author
+        columns = ('category', 'author') + STAGES
+        self.tree = ttk.Treeview(self.container, columns=columns, show='headings')
+        for column in columns:
+            self.tree.heading(column, text=column.replace('_', ' ').capitalize())
+            self.tree.column(column, anchor=tk.W if column in ('category', 'author') else tk.E, width=150)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        # Decoded image cache, updated every second
+        self.cache_label = tk.Label(self.container, text="", font=('Arial', 10), fg="gray")
+        self.cache_label.pack(anchor=tk.W, pady=(5, 0))
+
+        # Create buttons
+        button_frame = tk.Frame(self.container)
+        button_frame.pack(pady=10)
+
+        tk.Button(button_frame, text="Refresh", command=self.refresh, padx=20, pady=5).pack(side=tk.LEFT, padx=10)
+        tk.Button(button_frame, text="Recount from folders", command=self.rebuild,
+                  padx=20, pady=5).pack(side=tk.LEFT, padx=10)
+
+        self.refresh()
+        self.poll_cache()
+
+    def poll_cache(self):
+        """Show the hit rate and memory use of the decoded image cache"""
+        self.cache_label.configure(text=f"Image cache: {DECODED_IMAGES.stats()}")
+        self.after(1000, self.poll_cache)
+
+    def refresh(self):
+        """Show the current counts"""
+        self.tree.delete(*self.tree.get_children())
+        totals = [0] * len(STAGES)
+        for category, author, counts in self.app.stats.rows():
+            self.tree.insert('', tk.END, values=(category, author, *counts))
+            totals = [total + n for total, n in zip(totals, counts)]
+        self.tree.insert('', tk.END, values=('Total', '', *totals))
+
+    def rebuild(self):
+        """Recount the images of every stage folder"""
+        self.app.stats.rebuild()
+        self.refresh()
 
 def main():
+    parser = argparse.ArgumentParser(description="Image Processing Tool")
+    parser.add_argument('--export-coco', type=Path, metavar='FILE',
+                        help="export the crop boxes as a COCO JSON file and exit")
+    parser.add_argument('--export-yolo', type=Path, metavar='FOLDER',
+                        help="export the crop boxes as YOLO label files and exit")
+    parser.add_argument('--stats', action='store_true',
+                        help="print the image counts per stage, category and author and exit")
+    parser.add_argument('--rebuild-stats', action='store_true',
+                        help="recount the images of every stage folder before printing them (with --stats)")
+    args = parser.parse_args()
+    
+    if args.export_coco or args.export_yolo:
+        base_folder = Path("images")
+        annotations = AnnotationStore(base_folder / "annotations.jsonl", base_folder)
+        if args.export_coco:
+            with open(args.export_coco, 'w', encoding='utf-8') as f:
+                json.dump(annotations.to_coco(), f, indent=2)
+            print(f"Exported {len(annotations.records)} crop boxes to {args.export_coco}")
+        if args.export_yolo:
+            count = annotations.export_yolo(args.export_yolo)
+            print(f"Exported labels of {count} pictures to {args.export_yolo}")
+        return
+    
+    if args.stats:
+        base_folder = Path("images")
+        (base_folder / ".cache").mkdir(parents=True, exist_ok=True)
+        folders = {stage: base_folder / folder for stage, folder in
+                   zip(STAGES, ("1_categorized", "2_cropped", "3_multi_cropped", "4_rotated"))}
+        annotations = AnnotationStore(base_folder / "annotations.jsonl", base_folder)
+        stats = StatsIndex(base_folder / ".cache" / "stats.json", folders, annotations)
+        if args.rebuild_stats:
+            stats.rebuild()
+        print(stats.format_table())
+        return
+    
     app = ImageApp()
     app.mainloop()
 